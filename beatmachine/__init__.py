@@ -1,2 +1,17 @@
-from . import backends, effects
-from .beats import Beats
+import importlib
+
+# Effects are imported eagerly so they're registered with the EffectRegistry. Everything else is imported on first
+# use, since Beats pulls in audio libraries and the default backend pulls in madmom.
+from . import effects
+
+_LAZY_SUBMODULES = ("backends", "loaders")
+
+
+def __getattr__(name):
+    if name == "Beats":
+        from .beats import Beats
+
+        return Beats
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,22 @@
-import hashlib
 import importlib.metadata
 import inspect
 import json
 import os
-import pickle
 import shutil
 import tempfile
 import textwrap
+import typing as t
 from pathlib import Path
 from types import SimpleNamespace
 
 import click
-from jsonschema.exceptions import ValidationError
 
 import beatmachine as bm
-from beatmachine.backends.madmom import MadmomDbnBackend
+from beatmachine.backend import Backend
+from beatmachine.cache import BeatCache
 from beatmachine.effect_registry import EffectRegistry
+from beatmachine.profiling import Profile
+from beatmachine.server import DEFAULT_URL, JobServer, get_job, submit_job
 
 try:
     _version = importlib.metadata.version("beatmachine")
@@ -27,9 +28,31 @@ def _hint(msg):
     click.secho("Hint: " + msg, fg="blue")
 
 
+def _get_backend(ctx) -> Backend:
+    # Shared for the whole invocation, so models are only loaded once. Imported here, since madmom is slow to import
+    # and most commands don't need it.
+    if ctx.obj.backend is None and ctx.obj.backend_name == "onset":
+        from beatmachine.backends.onset import OnsetDpBackend
+
+        ctx.obj.backend = OnsetDpBackend(min_bpm=ctx.obj.min_bpm, max_bpm=ctx.obj.max_bpm)
+    elif ctx.obj.backend is None:
+        from beatmachine.backends.madmom import MadmomDbnBackend
+
+        ctx.obj.backend = MadmomDbnBackend(
+            min_bpm=ctx.obj.min_bpm,
+            max_bpm=ctx.obj.max_bpm,
+            model_count=ctx.obj.model_count,
+            workers=ctx.obj.workers,
+        )
+    return ctx.obj.backend
+
+
+def _get_cache(ctx) -> t.Optional[BeatCache]:
+    return BeatCache(_get_cache_dir(), ctx.obj.cache_size * 1024 * 1024) if ctx.obj.cache else None
+
+
 def _load_beats_from_song(ctx, input):
-    backend = MadmomDbnBackend(min_bpm=ctx.obj.min_bpm, max_bpm=ctx.obj.max_bpm, model_count=4)
-    return bm.Beats.from_song(input, backend)
+    return bm.Beats.from_song(input, _get_backend(ctx), dtype=ctx.obj.dtype, cache=_get_cache(ctx))
 
 
 def _get_cache_dir() -> Path:
@@ -38,17 +61,6 @@ def _get_cache_dir() -> Path:
     return cache_dir
 
 
-def _get_cache_file(song_file) -> Path:
-    cache_dir = _get_cache_dir()
-
-    md5 = hashlib.md5()
-    with open(song_file, "rb") as file:
-        while block := file.read(512):
-            md5.update(block)
-
-    return cache_dir / (md5.hexdigest())
-
-
 class BeatsParam(click.Path):
     def __init__(self, preprocess_hint=True):
         super().__init__(exists=True, dir_okay=False)
@@ -61,14 +73,10 @@ class BeatsParam(click.Path):
         value = super().convert(value, param, ctx)
 
         if value.endswith(".beat"):
-            with open(value, "rb") as fp:
-                beats = pickle.load(fp)
-            return (beats, value)
-
-        cached = _get_cache_file(value)
-        if ctx.obj.cache and cached.is_file():
-            with cached.open("rb") as fp:
-                beats = pickle.load(fp)
+            try:
+                beats = bm.Beats.from_beat_file(value)
+            except ValueError as e:
+                self.fail(str(e), param, ctx)
             return (beats, value)
 
         if self.preprocess_hint:
@@ -80,16 +88,16 @@ class BeatsParam(click.Path):
         click.echo(f"Locating beats in {value}")
         beats = _load_beats_from_song(ctx, value)
 
-        if ctx.obj.cache:
-            with cached.open("wb") as fp:
-                pickle.dump(beats, fp)
-
         return (beats, value)
 
 
 class EffectsParam(click.ParamType):
     name = "effects"
 
+    def __init__(self, load=True):
+        # Without loading, effects are passed on as plain JSON, e.g. to be validated by a server.
+        self.load = load
+
     def convert(self, value, param, ctx):
         if not value:
             return None
@@ -106,6 +114,11 @@ class EffectsParam(click.ParamType):
         if not isinstance(effects_obj, list):
             effects_obj = [effects_obj]
 
+        if not self.load:
+            return effects_obj
+
+        from jsonschema.exceptions import ValidationError
+
         try:
             return EffectRegistry.load_effect_chain(effects_obj)
         except ValidationError as e:
@@ -116,12 +129,50 @@ class EffectsParam(click.ParamType):
 
 
 @click.group()
+@click.option(
+    "-k",
+    "--backend",
+    "backend_name",
+    type=click.Choice(["madmom", "onset"]),
+    default="madmom",
+    help="Beat detector. 'onset' is much faster than 'madmom' but less accurate, and ignores -m and -w.",
+)
 @click.option("-b", "--min-bpm", type=int, default=60, help="Minimum BPM.")
 @click.option("-B", "--max-bpm", type=int, default=300, help="Maximum BPM.")
+@click.option(
+    "-m", "--model-count", type=click.IntRange(1, 8), default=4, help="Number of neural networks used to find beats."
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(1),
+    default=1,
+    help="Number of processes used to evaluate neural networks in parallel.",
+)
+@click.option(
+    "-d",
+    "--dtype",
+    type=click.Choice(["float64", "float32", "int16"]),
+    default="float64",
+    help="Sample type used to hold audio in memory. Smaller types use less memory.",
+)
 @click.option("-y", "--skip-confirm", is_flag=True, help="If set, skip confirmation prompts.")
 @click.option("--no-cache", is_flag=True, help="If set, disables song caching.", envvar="BEATMACHINE_NO_CACHE")
+@click.option(
+    "--cache-size",
+    type=click.IntRange(0),
+    default=64,
+    help="Maximum size of the song cache in MiB.",
+    envvar="BEATMACHINE_CACHE_SIZE",
+)
+@click.option(
+    "--profile",
+    type=click.File("w"),
+    help="If set, writes the time, memory, beats and bytes of each stage (loading, detection, effects and saving) to "
+    "this file as JSON.",
+)
 @click.pass_context
-def cli(ctx, min_bpm, max_bpm, skip_confirm, no_cache):
+def cli(ctx, backend_name, min_bpm, max_bpm, model_count, workers, dtype, skip_confirm, no_cache, cache_size, profile):
     """
     Remix songs by rearranging and modifying beats.
 
@@ -129,15 +180,56 @@ def cli(ctx, min_bpm, max_bpm, skip_confirm, no_cache):
 
     View the repository at https://github.com/beat-machine/beat-machine.
     """
-    ctx.obj = SimpleNamespace(min_bpm=min_bpm, max_bpm=max_bpm, skip_confirm=skip_confirm, cache=not no_cache)
+    ctx.obj = SimpleNamespace(
+        backend_name=backend_name,
+        min_bpm=min_bpm,
+        max_bpm=max_bpm,
+        model_count=model_count,
+        workers=workers,
+        dtype=dtype,
+        skip_confirm=skip_confirm,
+        cache=not no_cache,
+        cache_size=cache_size,
+        backend=None,
+    )
+
+    if profile:
+        report = ctx.with_resource(Profile())
+        ctx.call_on_close(lambda: json.dump(report.to_json(), profile, indent=2))
 
 
 @cli.command()
-@click.option("-e", "--effects", required=True, type=EffectsParam())
-@click.option("-o", "--output", type=click.Path(writable=True, dir_okay=False))
+@click.option(
+    "-e",
+    "--effects",
+    "effects_list",
+    required=True,
+    multiple=True,
+    type=EffectsParam(),
+    help="Effects to apply. Repeat to render several outputs from the same song.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "outputs",
+    multiple=True,
+    type=click.Path(writable=True, dir_okay=False),
+    help="Output path. Repeat once for each set of effects, in the same order.",
+)
+@click.option("-c", "--compile", "compile_", is_flag=True, help="If set, compiles effects into a single render plan.")
+@click.option(
+    "-j", "--jobs", "max_workers", type=click.IntRange(1), default=4, help="Number of outputs encoded at once."
+)
+@click.option(
+    "-p",
+    "--preview",
+    type=click.FloatRange(0, min_open=True),
+    metavar="SECONDS",
+    help="If set, only renders this many seconds from the start of the output.",
+)
 @click.argument("input", nargs=1, type=BeatsParam())
 @click.pass_context
-def apply(ctx, input, output, effects):
+def apply(ctx, input, outputs, effects_list, compile_, max_workers, preview):
     """
     Apply effects to a song or preprocessed `.beat` file.
 
@@ -146,17 +238,44 @@ def apply(ctx, input, output, effects):
     beats, filename = input
     stem, ext = os.path.splitext(filename)
 
-    if not output:
+    if not outputs:
         if ext == ".beat":
             ext = ".mp3"
 
-        output = stem + "-out" + ext
+        if len(effects_list) == 1:
+            outputs = [stem + "-out" + ext]
+        else:
+            outputs = [f"{stem}-out-{i}{ext}" for i in range(1, len(effects_list) + 1)]
+    elif len(outputs) != len(effects_list):
+        raise click.UsageError(f"Got {len(effects_list)} sets of effects, but {len(outputs)} outputs")
 
-    if os.path.isfile(output) and not ctx.obj.skip_confirm:
-        click.confirm(f"Overwrite existing file at {output}", abort=True)
+    for output in outputs:
+        if os.path.isfile(output) and not ctx.obj.skip_confirm:
+            click.confirm(f"Overwrite existing file at {output}", abort=True)
+
+    time_range = None if preview is None else (0, preview)
+
+    if len(effects_list) > 1:
+        click.echo(f"Applying {len(effects_list)} sets of effects")
+        beats.save_all(zip(effects_list, outputs), max_workers=max_workers, compiled=compile_, time_range=time_range)
+        for output in outputs:
+            click.echo(f"Wrote audio file to {output}")
+
+        print("Done!")
+        return
+
+    (effects,), (output,) = effects_list, outputs
 
     click.echo("Applying effects")
-    beats = beats.apply_all(*effects)
+    if time_range is not None:
+        beats, effects = beats.apply_all(*effects).trim(*time_range), ()
+
+    if compile_:
+        plan = beats.compile(*effects)
+        click.echo(f"Compiled effects into {len(plan)} operations ({plan.nbytes} bytes)")
+        beats = bm.Beats(beats.sample_rate, beats.channels, [plan.render()], beats.dtype)
+    else:
+        beats = beats.apply_all(*effects)
 
     click.echo(f"Writing audio file to {output}")
     beats.save(output)
@@ -167,8 +286,15 @@ def apply(ctx, input, output, effects):
 @cli.command()
 @click.argument("input", nargs=1, type=click.Path(exists=True, dir_okay=False))
 @click.option("-o", "--output", type=click.Path(writable=True, dir_okay=False))
+@click.option(
+    "-r",
+    "--reference",
+    is_flag=True,
+    help="If set, the beat file refers to the input song instead of embedding its audio. Smaller, but slower to open. "
+    "The beat file must be saved in the song's directory or below it.",
+)
 @click.pass_context
-def preprocess(ctx, input, output):
+def preprocess(ctx, input, output, reference):
     """
     Locate beats in an audio file and save them for later use.
     """
@@ -180,6 +306,17 @@ def preprocess(ctx, input, output):
     if not output:
         output = os.path.splitext(input)[0] + ".beat"
 
+    # Locating beats is slow, so problems with the output are reported before doing it.
+    if not os.path.isdir(os.path.dirname(os.path.abspath(output))):
+        raise click.BadParameter(f"the directory of {output} doesn't exist", param_hint="'-o' / '--output'")
+    if reference:
+        from beatmachine.beat_file import resolve_source
+
+        try:
+            resolve_source(output, os.path.abspath(input))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'-r' / '--reference'") from e
+
     click.echo(f"Processing {input}")
 
     beats = _load_beats_from_song(ctx, input)
@@ -188,12 +325,179 @@ def preprocess(ctx, input, output):
         click.confirm(f"Overwrite existing file at {output}", abort=True)
 
     click.echo(f"Writing beats to {output}")
-    with open(output, "wb") as fp:
-        fp.write(pickle.dumps(beats))
+    beats.to_beat_file(output, source=input if reference else None)
 
     print("Done!")
 
 
+@cli.command()
+@click.argument("manifest", nargs=1, type=click.Path(exists=True, dir_okay=False))
+@click.option("-j", "--jobs", "max_workers", type=click.IntRange(1), default=4, help="Number of jobs to run at once.")
+@click.option(
+    "-r",
+    "--report",
+    type=click.File("w"),
+    help="If set, writes the result and timings of each job to this file, one JSON object per line.",
+)
+@click.pass_context
+def batch(ctx, manifest, max_workers, report):
+    """
+    Apply effects to many songs at once.
+
+    MANIFEST has one JSON object per line, with an "input" song or `.beat` file, the "effects" to apply (inline or a
+    path to a JSON file), and an "output" path. Relative paths are resolved against the manifest's directory. Songs
+    are only analysed once, however many jobs use them. Failed jobs are reported without stopping the batch.
+    """
+
+    from beatmachine.batch import read_manifest, run_batch
+
+    try:
+        jobs = read_manifest(manifest)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    failures = 0
+    results = run_batch(
+        jobs,
+        _get_backend(ctx),
+        dtype=ctx.obj.dtype,
+        cache=_get_cache(ctx),
+        max_workers=max_workers,
+        overwrite=ctx.obj.skip_confirm,
+    )
+    for result in results:
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.timings.items())
+        if result.ok:
+            click.echo(f"[{result.index + 1}/{len(jobs)}] Wrote {result.job.output} ({timings})")
+        else:
+            failures += 1
+            click.secho(
+                f"[{result.index + 1}/{len(jobs)}] Failed {result.job.input}: {result.error}", fg="red", err=True
+            )
+
+        if report:
+            report.write(json.dumps(result.to_json()) + "\n")
+            report.flush()
+
+    click.echo(f"Done! {len(jobs) - failures} of {len(jobs)} jobs succeeded.")
+    if failures:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on.")
+@click.option("-p", "--port", type=click.IntRange(0, 65535), default=8765, help="Port to listen on.")
+@click.option("-j", "--jobs", "concurrency", type=click.IntRange(1), default=2, help="Number of jobs to run at once.")
+@click.option(
+    "--allow-host",
+    "allowed_hosts",
+    multiple=True,
+    help="Extra host name clients may use to reach the server, such as its LAN address. May be repeated.",
+)
+@click.pass_context
+def serve(ctx, host, port, concurrency, allowed_hosts):
+    """
+    Run a server that applies effects and preprocesses songs.
+
+    Models, effects and the song cache are loaded once and kept warm, so jobs sent with the 'submit' commands start
+    immediately. Jobs are queued and run a few at a time.
+    """
+
+    backend = _get_backend(ctx)
+    if hasattr(backend, "warmup"):
+        click.echo("Loading models")
+        backend.warmup()
+
+    job_server = JobServer(backend, dtype=ctx.obj.dtype, cache=_get_cache(ctx), concurrency=concurrency)
+    try:
+        job_server.serve(
+            host,
+            port,
+            ready=lambda s: click.echo(f"Listening on http://{s.server_address[0]}:{s.server_address[1]}"),
+            allowed_hosts=allowed_hosts,
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        job_server.close()
+
+
+@cli.group()
+@click.option(
+    "-s", "--server", default=DEFAULT_URL, help="URL of the server started with 'serve'.", envvar="BEATMACHINE_SERVER"
+)
+@click.option("--no-wait", is_flag=True, help="If set, prints the job ID instead of waiting for the job to finish.")
+@click.pass_context
+def submit(ctx, server, no_wait):
+    """
+    Send a job to a running server.
+    """
+    ctx.obj.server = server
+    ctx.obj.wait = not no_wait
+
+
+def _submit(ctx, request):
+    try:
+        job_id = submit_job(request, ctx.obj.server)
+        if not ctx.obj.wait:
+            click.echo(job_id)
+            return
+
+        click.echo(f"Submitted job {job_id}")
+        job = get_job(job_id, ctx.obj.server, wait=30)
+        while job["status"] in ("queued", "running"):
+            job = get_job(job_id, ctx.obj.server, wait=30)
+    except (OSError, RuntimeError) as e:
+        raise click.ClickException(f"Couldn't reach server at {ctx.obj.server}: {e}")
+
+    if job["status"] == "failed":
+        raise click.ClickException(job["error"])
+
+    click.echo(f"Wrote {job['request']['output']}")
+
+
+@submit.command("apply")
+@click.option("-e", "--effects", required=True, type=EffectsParam(load=False))
+@click.option("-o", "--output", type=click.Path(writable=True, dir_okay=False))
+@click.argument("input", nargs=1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def submit_apply(ctx, input, output, effects):
+    """
+    Apply effects to a song or preprocessed `.beat` file on the server.
+    """
+
+    stem, ext = os.path.splitext(input)
+    if not output:
+        output = stem + "-out" + (".mp3" if ext == ".beat" else ext)
+
+    _submit(
+        ctx,
+        {"command": "apply", "input": os.path.abspath(input), "effects": effects, "output": os.path.abspath(output)},
+    )
+
+
+@submit.command("preprocess")
+@click.option("-o", "--output", type=click.Path(writable=True, dir_okay=False))
+@click.option("-r", "--reference", is_flag=True, help="If set, the beat file refers to the input song.")
+@click.argument("input", nargs=1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def submit_preprocess(ctx, input, output, reference):
+    """
+    Locate beats in an audio file on the server and save them for later use.
+    """
+
+    output = output or os.path.splitext(input)[0] + ".beat"
+    _submit(
+        ctx,
+        {
+            "command": "preprocess",
+            "input": os.path.abspath(input),
+            "output": os.path.abspath(output),
+            "reference": reference,
+        },
+    )
+
+
 def _print_effect_human_readable(effect_cls):
     effect_name = effect_cls.__effect_name__
     print(effect_name)
@@ -4,5 +4,25 @@ import numpy as np
 
 
 class Backend(t.Protocol):
+    """
+    A Backend locates beats in a signal.
+
+    Backends may set ``analysis_sample_rate`` and ``analysis_channels`` to the sample rate and channel count they
+    work best with. Signals are then downmixed and resampled before being passed to the backend, and the positions it
+    returns are mapped back to the original sample rate. Either may be ``None`` (or missing) to receive the signal
+    as-is.
+    """
+
+    analysis_sample_rate: t.Optional[int]
+    analysis_channels: t.Optional[int]
+
     def locate_beats(self, signal: np.ndarray, sample_rate: int) -> np.ndarray:
         raise NotImplementedError()
+
+
+class StreamingBackend(Backend, t.Protocol):
+    def iter_beats(self, signal: np.ndarray, sample_rate: int) -> t.Iterator[int]:
+        """
+        Locates beats incrementally, yielding each beat's position in samples as soon as it is known.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,10 @@
+import importlib
+
+_SUBMODULES = ("bpm", "madmom", "onset")
+
+
+def __getattr__(name):
+    # Backends are imported on first use, since madmom is slow to import.
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,10 @@ import numpy as np
 
 
 class BpmBackend:
+    # Beats are laid out on a fixed grid, so there's nothing to gain from downmixing or resampling.
+    analysis_sample_rate = None
+    analysis_channels = None
+
     def __init__(self, bpm: float, first_beat_ms: float) -> None:
         super().__init__()
         self.bpm = bpm
@@ -9,5 +13,5 @@ class BpmBackend:
 
     def locate_beats(self, signal: np.ndarray, sample_rate: int) -> np.ndarray:
         samples_per_beat = int((60 * sample_rate) / self.bpm)
-        downbeat_sample = int(sample_rate * 1000 * self.first_beat_ms)
+        downbeat_sample = int(sample_rate * self.first_beat_ms / 1000)
         return np.arange(downbeat_sample, signal.shape[0], samples_per_beat)
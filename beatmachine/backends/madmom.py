@@ -1,27 +1,177 @@
 import glob
+import multiprocessing
+import threading
 import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import numpy as np
 from madmom.audio import Signal
 from madmom.features.beats import DBNBeatTrackingProcessor, RNNBeatProcessor
 from madmom.models import MODEL_PATH as MADMOM_MODEL_PATH
 
+# Per-model processors loaded inside worker processes, by model file.
+_worker_processors: t.Dict[str, RNNBeatProcessor] = {}
+
+
+def _load_model(nn_file: str) -> None:
+    if nn_file not in _worker_processors:
+        _worker_processors[nn_file] = RNNBeatProcessor(nn_files=[nn_file])
+
+
+def _model_activations(nn_file: str, signal: np.ndarray, sample_rate: int) -> np.ndarray:
+    _load_model(nn_file)
+    return _worker_processors[nn_file](Signal(signal, sample_rate))
+
 
 class MadmomDbnBackend:
-    def __init__(self, min_bpm: int = 60, max_bpm: int = 300, fps: int = 100, model_count: int = 8) -> None:
+    """
+    Locates beats with madmom's BLSTM ensemble followed by a DBN beat tracker.
+
+    The neural networks are loaded the first time they are needed, or when ``warmup`` is called, and then reused for
+    every subsequent call. A single instance can safely be shared between threads.
+
+    With ``workers`` greater than 1, each network in the ensemble is evaluated in a separate process and their
+    activations are averaged, exactly as madmom does when evaluating them sequentially. Call ``close`` to shut the
+    worker processes down.
+    """
+
+    # madmom's models were trained on mono audio at 44.1 kHz.
+    analysis_sample_rate = 44100
+    analysis_channels = 1
+
+    def __init__(
+        self, min_bpm: int = 60, max_bpm: int = 300, fps: int = 100, model_count: int = 8, workers: int = 1
+    ) -> None:
         super().__init__()
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, but was {workers}")
+
         self.min_bpm = min_bpm
         self.max_bpm = max_bpm
         self.fps = fps
         self.model_count = model_count
+        self.workers = workers
+        self._processors = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_processors"] = None
+        state["_pool"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def cache_params(self) -> dict:
+        # The number of workers doesn't change the result.
+        return {"min_bpm": self.min_bpm, "max_bpm": self.max_bpm, "fps": self.fps, "model_count": self.model_count}
 
     def _get_nn_files(self) -> t.Iterable[str]:
         return sorted(glob.glob(f"{MADMOM_MODEL_PATH}/beats/2015/beats_blstm_[1-{self.model_count}].pkl"))
 
+    def _get_processors(self) -> t.Tuple[t.Optional[RNNBeatProcessor], DBNBeatTrackingProcessor]:
+        if self._processors is None:
+            with self._lock:
+                if self._processors is None:
+                    # Worker processes load their own networks, so there's no need to load them here too.
+                    processor = RNNBeatProcessor(nn_files=self._get_nn_files()) if self.workers == 1 else None
+                    tracker = DBNBeatTrackingProcessor(min_bpm=self.min_bpm, max_bpm=self.max_bpm, fps=self.fps)
+                    self._processors = (processor, tracker)
+
+        return self._processors
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+
+        return self._pool
+
+    def _activations(self, signal: np.ndarray, sample_rate: int) -> np.ndarray:
+        processor, _ = self._get_processors()
+        if processor is not None:
+            return processor(Signal(signal, sample_rate))
+
+        nn_files = self._get_nn_files()
+        activations = list(self._get_pool().map(_model_activations, nn_files, repeat(signal), repeat(sample_rate)))
+
+        # Same as madmom's average_predictions, so results match the sequential path exactly.
+        return sum(activations) / len(activations) if len(activations) > 1 else activations[0]
+
+    def warmup(self) -> None:
+        """
+        Loads the neural networks ahead of time, so the first call to ``locate_beats`` doesn't pay for it.
+        """
+        self._get_processors()
+        if self.workers > 1:
+            for _ in self._get_pool().map(_load_model, self._get_nn_files()):
+                pass
+
+    def close(self) -> None:
+        """
+        Shuts down any worker processes. The backend can still be used afterwards, and will start new ones if needed.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
     def locate_beats(self, signal: np.ndarray, sample_rate: int) -> np.ndarray:
-        madmom_signal = Signal(signal, sample_rate)
-        tracker = DBNBeatTrackingProcessor(min_bpm=self.min_bpm, max_bpm=self.max_bpm, fps=self.fps)
-        processor = RNNBeatProcessor(nn_files=self._get_nn_files())
+        _, tracker = self._get_processors()
 
         # tracker returns positions in sec
-        return (tracker(processor(madmom_signal)) * madmom_signal.sample_rate).astype(np.int64)
+        return (tracker(self._activations(np.asarray(signal), sample_rate)) * sample_rate).astype(np.int64)
+
+    def iter_beats(
+        self, signal: np.ndarray, sample_rate: int, chunk_seconds: float = 60, overlap_seconds: float = 10
+    ) -> t.Iterator[int]:
+        """
+        Locates beats one window at a time, yielding their positions in samples as each window is analysed. Memory use
+        is bounded by the window size rather than the length of the signal.
+
+        Consecutive windows overlap, and beats are taken from each window only up to the middle of its overlap with
+        the next one, away from the edges where detection is unreliable. The result is close to, but not always
+        exactly the same as, ``locate_beats``.
+
+        :param signal: Signal to analyse.
+        :param sample_rate: Sample rate of the signal.
+        :param chunk_seconds: Length of each analysis window.
+        :param overlap_seconds: How much consecutive windows overlap. Must be less than half of ``chunk_seconds``.
+        :return: A generator yielding beat positions in samples, in increasing order.
+        """
+        if not 0 <= 2 * overlap_seconds < chunk_seconds:
+            raise ValueError(
+                f"overlap_seconds must be >= 0 and less than half of chunk_seconds, but was {overlap_seconds}"
+            )
+
+        signal = np.asarray(signal)
+        _, tracker = self._get_processors()
+
+        chunk = int(chunk_seconds * sample_rate)
+        overlap = int(overlap_seconds * sample_rate)
+        min_interval = int(60 * sample_rate / self.max_bpm)
+
+        emit_from = 0
+        last_beat = None
+        for start in range(0, max(len(signal) - overlap, 1), chunk - overlap):
+            window = signal[start : start + chunk]
+            end = start + len(window)
+            seam = end - overlap // 2 if end < len(signal) else end
+
+            beats = (tracker(self._activations(window, sample_rate)) * sample_rate).astype(np.int64) + start
+            for beat in beats[(beats >= emit_from) & (beats < seam)].tolist():
+                # Both windows may have found the same beat on either side of the seam.
+                if last_beat is None or beat - last_beat >= min_interval:
+                    yield beat
+                    last_beat = beat
+
+            emit_from = seam
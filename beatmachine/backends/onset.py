@@ -0,0 +1,188 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Number of frames transformed at once, which bounds the memory used by the spectrogram.
+_BLOCK_FRAMES = 1024
+
+# Signals sampled faster than this are decimated before analysis.
+_MAX_SAMPLE_RATE = 22050
+
+
+def onset_envelope(signal: np.ndarray, frame_size: int, hop_size: int, smoothing: int) -> np.ndarray:
+    """
+    Measures how much new energy arrives in each frame of a mono signal, as the half-wave rectified spectral flux of
+    its log-magnitude spectrogram. Frames are centred on multiples of ``hop_size``.
+
+    :param signal: Mono signal.
+    :param frame_size: Length of each FFT frame in samples.
+    :param hop_size: Distance between consecutive frames in samples.
+    :param smoothing: Number of frames the local mean is taken over. The local mean is subtracted from each frame.
+    :return: Onset strength of each frame, normalised to unit standard deviation.
+    """
+    signal = np.asarray(signal, dtype=np.float32).reshape(-1)
+    frames = sliding_window_view(np.pad(signal, frame_size // 2), frame_size)[::hop_size]
+    window = np.hanning(frame_size).astype(np.float32)
+
+    # Weighting each bin by its inverse frequency gives every octave the same weight, as a mel spectrogram would, so
+    # broadband noise like hi-hats doesn't drown out kick drums.
+    weights = (1 / np.maximum(np.arange(frame_size // 2 + 1), 1)).astype(np.float32)
+    weights /= weights.sum()
+
+    flux = np.zeros(len(frames), dtype=np.float32)
+    previous = None
+    for start in range(0, len(frames), _BLOCK_FRAMES):
+        spectrum = np.log1p(1000 * np.abs(np.fft.rfft(frames[start : start + _BLOCK_FRAMES] * window, axis=1)))
+        rows = spectrum if previous is None else np.concatenate([previous, spectrum])
+        flux[start + (previous is None) : start + len(spectrum)] = np.maximum(np.diff(rows, axis=0), 0) @ weights
+        previous = spectrum[-1:]
+
+    # Removing the local mean keeps sustained, noisy passages from drowning out actual onsets.
+    smoothing = max(min(smoothing, len(flux)), 1)
+    flux -= np.convolve(flux, np.full(smoothing, 1 / smoothing, dtype=np.float32), mode="same")
+    np.maximum(flux, 0, out=flux)
+
+    deviation = flux.std()
+    return flux / deviation if deviation > 0 else flux
+
+
+def estimate_period(envelope: np.ndarray, fps: float, min_bpm: float, max_bpm: float, start_bpm: float) -> float:
+    """
+    Estimates the beat period of an onset envelope from its autocorrelation, weighted towards ``start_bpm`` to avoid
+    settling on double or half the tempo.
+
+    :param envelope: Onset strength of each frame.
+    :param fps: Frames per second of the envelope.
+    :param min_bpm: Slowest tempo considered.
+    :param max_bpm: Fastest tempo considered.
+    :param start_bpm: Most likely tempo.
+    :return: Beat period in frames, with sub-frame precision.
+    """
+    count = len(envelope)
+    min_lag = max(int(np.floor(60 * fps / max_bpm)), 1)
+    max_lag = min(int(np.ceil(60 * fps / min_bpm)), count - 2)
+    if max_lag <= min_lag:
+        return 60 * fps / start_bpm
+
+    # Onsets rarely fall exactly on frame boundaries, so the period is rarely a whole number of frames. Blurring the
+    # envelope keeps the autocorrelation peak from being split across neighbouring lags.
+    width = max(0.02 * fps, 0.5)
+    kernel = np.exp(-0.5 * (np.arange(-int(3 * width), int(3 * width) + 1) / width) ** 2)
+    centred = np.convolve(envelope - envelope.mean(), kernel / kernel.sum(), mode="same")
+    spectrum = np.fft.rfft(centred, 2 * count)
+    autocorrelation = np.fft.irfft(spectrum.real**2 + spectrum.imag**2)[: max_lag + 2]
+    # Longer lags overlap less of the envelope, so they're normalised by how much.
+    autocorrelation /= count - np.arange(len(autocorrelation))
+
+    lags = np.arange(min_lag, max_lag + 1)
+    prior = np.exp(-0.5 * np.log2(60 * fps / lags / start_bpm) ** 2)
+    lag = lags[np.argmax(autocorrelation[lags] * prior)]
+
+    # Parabolic interpolation around the peak gives a fractional period, which matters over long songs.
+    before, peak, after = autocorrelation[lag - 1 : lag + 2]
+    curvature = before - 2 * peak + after
+    offset = 0.5 * (before - after) / curvature if curvature < 0 else 0.0
+    return lag + float(np.clip(offset, -0.5, 0.5))
+
+
+def track_beats(envelope: np.ndarray, period: float, tightness: float) -> np.ndarray:
+    """
+    Finds the sequence of beats that best balances landing on strong onsets against keeping a steady period, by
+    dynamic programming.
+
+    :param envelope: Onset strength of each frame.
+    :param period: Beat period in frames.
+    :param tightness: How strongly deviations from the period are penalised.
+    :return: Frame index of each beat, in increasing order.
+    """
+    count = len(envelope)
+    if not envelope.any():
+        return np.empty(0, dtype=np.int64)
+
+    # Candidate predecessors lie between half and twice a period back, ordered from farthest to nearest.
+    offsets = np.arange(int(round(2 * period)), max(int(round(period / 2)), 1) - 1, -1)
+    penalty = -tightness * np.log(offsets / period) ** 2
+    farthest, nearest = offsets[0], offsets[-1]
+
+    score = envelope.astype(np.float64)
+    backlinks = np.full(count, -1, dtype=np.int64)
+    for frame in range(nearest, count):
+        first = frame - farthest
+        candidates = score[max(first, 0) : frame - nearest + 1] + penalty[max(-first, 0) :]
+        best = np.argmax(candidates)
+        if candidates[best] > 0:
+            score[frame] += candidates[best]
+            backlinks[frame] = max(first, 0) + best
+
+    # The last beat is the best-scoring frame within a period of the end. Further back, a later beat would have fit.
+    tail = min(max(int(round(period)), 1), count)
+    last = count - tail + np.argmax(score[-tail:])
+
+    beats = [last]
+    while backlinks[beats[-1]] >= 0:
+        beats.append(backlinks[beats[-1]])
+    beats = np.array(beats[::-1], dtype=np.int64)
+
+    # Silence at either end still gets beats at the right tempo; drop them.
+    strengths = envelope[beats]
+    threshold = 0.5 * np.sqrt(np.mean(strengths**2))
+    strong = np.flatnonzero(strengths >= threshold)
+    return beats[strong[0] : strong[-1] + 1] if len(strong) else beats
+
+
+class OnsetDpBackend:
+    """
+    Locates beats with spectral-flux onset detection, autocorrelation tempo estimation and dynamic-programming beat
+    tracking, as described by Ellis (2007). Everything is done with NumPy, so no models need to be loaded and songs are
+    analysed hundreds of times faster than real-time. It assumes a steady tempo, and is less accurate than
+    ``MadmomDbnBackend`` on songs with tempo changes or weak percussion.
+    """
+
+    # Onsets are found in a mono downmix. The frame size is derived from the sample rate, so no resampling is needed.
+    analysis_sample_rate = None
+    analysis_channels = 1
+
+    def __init__(
+        self,
+        min_bpm: float = 60,
+        max_bpm: float = 300,
+        start_bpm: float = 120,
+        tightness: float = 100,
+        frame_ms: float = 46.4,
+        hop_ms: float = 11.6,
+    ) -> None:
+        """
+        :param min_bpm: Slowest tempo considered.
+        :param max_bpm: Fastest tempo considered.
+        :param start_bpm: Most likely tempo, used to choose between multiples of the same tempo.
+        :param tightness: How strongly beats are kept to a steady tempo, rather than following onsets.
+        :param frame_ms: Length of each analysis frame. Rounded to a power of two samples.
+        :param hop_ms: Distance between consecutive analysis frames. Limits how precisely beats are placed.
+        """
+        super().__init__()
+        if not 0 < min_bpm < max_bpm:
+            raise ValueError(f"min_bpm must be positive and less than max_bpm, but was {min_bpm}")
+
+        self.min_bpm = min_bpm
+        self.max_bpm = max_bpm
+        self.start_bpm = start_bpm
+        self.tightness = tightness
+        self.frame_ms = frame_ms
+        self.hop_ms = hop_ms
+
+    def locate_beats(self, signal: np.ndarray, sample_rate: int) -> np.ndarray:
+        signal = np.asarray(signal, dtype=np.float32).reshape(-1)
+
+        # Nothing above about 11 kHz matters for finding onsets, so high sample rates are decimated by averaging, which
+        # makes every FFT smaller. Proper resampling would need scipy, and isn't worth its cost here.
+        factor = max(sample_rate // _MAX_SAMPLE_RATE, 1)
+        if factor > 1:
+            signal = signal[: len(signal) - len(signal) % factor].reshape(-1, factor).mean(axis=1)
+            sample_rate /= factor
+
+        frame_size = 1 << max(int(round(np.log2(self.frame_ms * sample_rate / 1000))), 4)
+        hop_size = max(int(round(self.hop_ms * sample_rate / 1000)), 1)
+        fps = sample_rate / hop_size
+
+        envelope = onset_envelope(signal, frame_size, hop_size, int(fps / 2))
+        period = estimate_period(envelope, fps, self.min_bpm, self.max_bpm, self.start_bpm)
+        return track_beats(envelope, period, self.tightness) * (hop_size * factor)
@@ -0,0 +1,278 @@
+import json
+import subprocess
+import threading
+import time
+import typing as t
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from jsonschema.exceptions import ValidationError
+
+from .backend import Backend
+from .beats import Beats
+from .cache import BeatCache
+from .effect_registry import EffectRegistry
+from .loader import Loader
+
+
+class BatchJob:
+    """
+    A BatchJob applies one effect chain to one song and saves the result.
+    """
+
+    input: Path
+    effects: t.Union[str, dict, t.List[dict]]
+    output: Path
+
+    def __init__(
+        self, input: t.Union[str, Path], effects: t.Union[str, dict, t.List[dict]], output: t.Union[str, Path]
+    ):
+        """
+        :param input: Path to a song or beat file.
+        :param effects: An effect, a list of effects, or a path to a JSON file containing either.
+        :param output: Path to save the result to.
+        """
+        self.input = Path(input)
+        self.effects = effects
+        self.output = Path(output)
+
+    def load_effects(self) -> t.List:
+        """
+        Loads and validates this job's effect chain.
+
+        :return: A list of effects.
+        """
+        effects = self.effects
+        if isinstance(effects, str):
+            with open(effects, "r") as fp:
+                effects = json.load(fp)
+
+        if not isinstance(effects, list):
+            effects = [effects]
+
+        return EffectRegistry.load_effect_chain(effects)
+
+
+class PreprocessJob:
+    """
+    A PreprocessJob locates the beats of one song and saves them to a beat file.
+    """
+
+    input: Path
+    output: Path
+    reference: bool
+
+    def __init__(self, input: t.Union[str, Path], output: t.Union[str, Path], reference: bool = False):
+        """
+        :param input: Path to a song.
+        :param output: Path to save the beat file to.
+        :param reference: If set, the beat file refers to the song instead of embedding its audio.
+        """
+        self.input = Path(input)
+        self.output = Path(output)
+        self.reference = reference
+
+
+class BatchResult:
+    """
+    A BatchResult describes the outcome of a BatchJob or PreprocessJob.
+    """
+
+    index: int
+    job: t.Union[BatchJob, PreprocessJob]
+    error: t.Optional[str]
+    timings: t.Dict[str, float]
+
+    def __init__(
+        self, index: int, job: t.Union[BatchJob, PreprocessJob], error: t.Optional[str], timings: t.Dict[str, float]
+    ):
+        """
+        :param index: Position of the job in the batch.
+        :param job: The job.
+        :param error: Description of the error that made the job fail, or None if it succeeded.
+        :param timings: Seconds spent loading the song and rendering or writing the output, by name.
+        """
+        self.index = index
+        self.job = job
+        self.error = error
+        self.timings = timings
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_json(self) -> dict:
+        return {
+            "index": self.index,
+            "input": str(self.job.input),
+            "output": str(self.job.output),
+            "ok": self.ok,
+            "error": self.error,
+            "timings": self.timings,
+        }
+
+
+def read_manifest(path: t.Union[str, Path]) -> t.List[BatchJob]:
+    """
+    Reads a batch manifest. Each non-empty line is a JSON object with "input", "effects" and "output" keys, in the
+    same form as the arguments to ``BatchJob``. Relative paths are resolved against the manifest's directory.
+
+    :param path: Path to the manifest.
+    :return: The jobs in the manifest, in order.
+    """
+    path = Path(path)
+    base = path.parent
+
+    jobs = []
+    with path.open("r") as fp:
+        for number, line in enumerate(fp, 1):
+            if not line.strip():
+                continue
+
+            try:
+                entry = json.loads(line)
+                effects = entry["effects"]
+                if isinstance(effects, str):
+                    effects = str(base / effects)
+                jobs.append(BatchJob(base / entry["input"], effects, base / entry["output"]))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: invalid job: {e}") from e
+
+    return jobs
+
+
+class _SharedSongs:
+    """
+    Loads each song once, no matter how many jobs use it, and forgets it once the last of them has finished.
+    """
+
+    def __init__(self, load: t.Callable[[Path], Beats], inputs: t.Iterable[Path]):
+        self._load = load
+        self._users = Counter(inputs)
+        self._songs: t.Dict[Path, Future] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, path: Path) -> Beats:
+        with self._lock:
+            song = self._songs.get(path)
+            owner = song is None
+            if owner:
+                song = self._songs[path] = Future()
+
+        if owner:
+            try:
+                song.set_result(self._load(path))
+            except Exception as e:
+                song.set_exception(e)
+
+        return song.result()
+
+    def release(self, path: Path):
+        with self._lock:
+            self._users[path] -= 1
+            if self._users[path] == 0:
+                self._songs.pop(path, None)
+
+
+def _describe_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        # Validation errors include the entire schema, which is far too much to report.
+        message = e.message
+    elif isinstance(e, subprocess.CalledProcessError) and e.stderr:
+        message = f"ffmpeg exited with status {e.returncode}: {e.stderr}"
+    else:
+        message = str(e)
+
+    return f"{type(e).__name__}: {message}"
+
+
+def _run_job(songs: _SharedSongs, index: int, job: t.Union[BatchJob, PreprocessJob], overwrite: bool) -> BatchResult:
+    timings = {}
+    try:
+        try:
+            # Anything that can be checked without the song is, so mistakes are reported before the slow part.
+            preprocess = isinstance(job, PreprocessJob)
+            if preprocess and job.input.suffix == ".beat":
+                raise ValueError(f"{job.input} has already been preprocessed")
+            effects = None if preprocess else job.load_effects()
+            if not overwrite and job.output.exists():
+                raise FileExistsError(f"{job.output} already exists")
+
+            start = time.perf_counter()
+            beats = songs.acquire(job.input)
+            timings["load"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if preprocess:
+                beats.to_beat_file(job.output, source=job.input if job.reference else None)
+                timings["write"] = time.perf_counter() - start
+            else:
+                beats.apply_all(*effects).save(str(job.output))
+                timings["render"] = time.perf_counter() - start
+        finally:
+            songs.release(job.input)
+    except Exception as e:
+        return BatchResult(index, job, _describe_error(e), timings)
+
+    return BatchResult(index, job, None, timings)
+
+
+def _song_loader(
+    backend: t.Optional[Backend], dtype: t.Any, loader: t.Optional[Loader], cache: t.Optional[BeatCache]
+) -> t.Callable[[Path], Beats]:
+    def load(path: Path) -> Beats:
+        if path.suffix == ".beat":
+            return Beats.from_beat_file(path, loader)
+        return Beats.from_song(path, backend, dtype, loader, cache=cache)
+
+    return load
+
+
+def run_job(
+    job: t.Union[BatchJob, PreprocessJob],
+    backend: Backend = None,
+    dtype: t.Any = np.float64,
+    loader: Loader = None,
+    cache: BeatCache = None,
+    overwrite: bool = True,
+) -> BatchResult:
+    """
+    Runs a single job in the calling thread. Arguments are as for ``run_batch``.
+
+    :param job: Job to run.
+    :return: The job's result. Errors are reported in it rather than raised.
+    """
+    songs = _SharedSongs(_song_loader(backend, dtype, loader, cache), [job.input])
+    return _run_job(songs, 0, job, overwrite)
+
+
+def run_batch(
+    jobs: t.Iterable[t.Union[BatchJob, PreprocessJob]],
+    backend: Backend = None,
+    dtype: t.Any = np.float64,
+    loader: Loader = None,
+    cache: BeatCache = None,
+    max_workers: int = None,
+    overwrite: bool = True,
+) -> t.Iterator[BatchResult]:
+    """
+    Runs jobs concurrently on a thread pool. Songs used by several jobs are only decoded and analysed once, and every
+    job shares the same backend, so models are only loaded once. A job that fails doesn't stop the others.
+
+    :param jobs: Jobs to run.
+    :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+    :param dtype: Sample dtype to load songs with, one of float64, float32 or int16.
+    :param loader: Loader used to decode songs. Defaults to libsndfile, falling back to ffmpeg.
+    :param cache: If given, beat locations are looked up in and saved to this cache.
+    :param max_workers: Maximum number of jobs run at once. Defaults to the thread pool's default.
+    :param overwrite: Whether existing output files may be overwritten. If not, jobs writing to them fail.
+    :return: A generator yielding a BatchResult for each job, in the order they finish.
+    """
+    jobs = list(jobs)
+    songs = _SharedSongs(_song_loader(backend, dtype, loader, cache), (job.input for job in jobs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_job, songs, index, job, overwrite) for index, job in enumerate(jobs)]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,198 @@
+import json
+import os
+import struct
+import typing as t
+from pathlib import Path
+
+import numpy as np
+
+from .edit_list import EditList
+from .loader import Loader
+from .utils import SAMPLE_FORMATS, sample_dtype
+
+# A beat file is laid out as follows. All integers are little-endian.
+#
+#   offset 0    magic         8 bytes, b"BEATMACH"
+#   offset 8    version       uint32
+#   offset 12   header size   uint32, N
+#   offset 16   header        N bytes of UTF-8 JSON
+#   (padding to a multiple of 64 bytes)
+#               index         int64 array of shape (4, beats): the start, stop, step and repeats of each beat in the
+#                             signal, as in an EditList. Version 1 files have no repeats row.
+#   (padding to a multiple of 64 bytes)
+#               signal        raw interleaved samples of shape (frames, channels), in the header's dtype
+#
+# The header holds "sample_rate", "channels", "frames", "beats", "dtype" (a NumPy dtype string such as "<f4") and
+# "source". If "source" is null the signal is embedded, otherwise it is omitted and "source" is the path of the song
+# to decode it from, relative to the beat file. The song must be in the beat file's directory or below it, so beat
+# files received from others can't read arbitrary files.
+
+MAGIC = b"BEATMACH"
+VERSION = 2
+
+# Rows in the index, by version.
+_INDEX_ROWS = {1: 3, 2: 4}
+
+# Integer fields of the header, and their smallest valid values.
+_HEADER_INTS = {"sample_rate": 1, "channels": 1, "frames": 0, "beats": 0}
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+# Longest a beat file may render to, in seconds. Anything longer is almost certainly corrupt, and would take forever to
+# save.
+_MAX_DURATION = 24 * 60 * 60
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset % _ALIGNMENT)
+
+
+def resolve_source(path: t.Union[str, Path], source: t.Union[str, Path]) -> Path:
+    """
+    Resolves the path of a beat file's source song, making sure it doesn't escape the beat file's directory.
+
+    :param path: Path to the beat file.
+    :param source: Path to the song, relative to the beat file's directory or absolute.
+    :return: Absolute path to the song.
+    """
+    path = Path(path)
+    directory = path.parent.resolve()
+    resolved = (directory / source).resolve()
+    if not resolved.is_relative_to(directory):
+        raise ValueError(f"{source} is outside the directory of {path}")
+    return resolved
+
+
+def _parse_header(path: Path, data: bytes) -> dict:
+    header = json.loads(data)
+    if not isinstance(header, dict):
+        raise ValueError(f"{path} has a malformed header")
+
+    # bool is a subclass of int, but true isn't a number of frames.
+    for key, minimum in _HEADER_INTS.items():
+        value = header.get(key)
+        if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+            raise ValueError(f"{path} has an invalid {key} {value!r} in its header")
+
+    if not isinstance(header.get("dtype"), str):
+        raise ValueError(f"{path} has an invalid dtype {header.get('dtype')!r} in its header")
+    if not isinstance(header.get("source"), (str, type(None))):
+        raise ValueError(f"{path} has an invalid source {header.get('source')!r} in its header")
+
+    return header
+
+
+def _validate_index(path: Path, index: np.ndarray, frames: int, sample_rate: int) -> None:
+    starts, stops, steps, repeats = index if len(index) == 4 else (*index, np.ones(index.shape[1], dtype=np.int64))
+    if not np.isin(steps, (-1, 0, 1)).all():
+        raise ValueError(f"{path} has beats with steps other than -1, 0 or 1")
+    if np.any(repeats < 1):
+        raise ValueError(f"{path} has beats repeated less than once")
+
+    # Silent beats only use their length, so they may extend past the end of the signal. Silencing repeated beats
+    # folds the repeats into their length, for example.
+    played = steps != 0
+    if np.any(starts < 0) or np.any(stops < starts) or np.any(stops[played] > frames):
+        raise ValueError(f"{path} has beats outside of its {frames} frame signal")
+
+    # The total is summed as floats, since a corrupt file's lengths and repeats may overflow integers.
+    duration = np.sum((stops - starts).astype(np.float64) * repeats) / sample_rate
+    if duration > _MAX_DURATION:
+        raise ValueError(f"{path} would render {duration:.0f} seconds of audio, more than {_MAX_DURATION}")
+
+
+def write_beat_file(
+    path: t.Union[str, Path], sample_rate: int, beats: EditList, source: t.Union[str, Path] = None
+) -> None:
+    """
+    Writes beats to a beat file.
+
+    :param path: Path to write to.
+    :param sample_rate: Sample rate of the beats.
+    :param beats: Beats to write.
+    :param source: If given, the song that ``beats.source`` was decoded from. Its path is stored instead of the signal.
+                   It must be in the same directory as ``path`` or below it.
+    """
+    path = Path(path)
+    signal = beats.source
+    dtype = sample_dtype(signal.dtype).newbyteorder("<")
+    index = np.stack([beats.starts, beats.stops, beats.steps, beats.repeats]).astype("<i8")
+    _validate_index(path, index, len(signal), sample_rate)
+
+    if source is not None:
+        source = os.path.relpath(resolve_source(path, Path(source).absolute()), path.parent.resolve())
+
+    header = json.dumps(
+        {
+            "sample_rate": sample_rate,
+            "channels": signal.shape[1],
+            "frames": len(signal),
+            "beats": len(beats),
+            "dtype": dtype.str,
+            "source": None if source is None else Path(source).as_posix(),
+        }
+    ).encode()
+
+    with open(path, "wb") as fp:
+        fp.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        fp.write(header)
+        fp.write(bytes(_align(fp.tell()) - fp.tell()))
+        fp.write(index.tobytes())
+
+        if source is None:
+            fp.write(bytes(_align(fp.tell()) - fp.tell()))
+            fp.write(np.ascontiguousarray(signal, dtype=dtype).data)
+
+
+def read_beat_file(path: t.Union[str, Path], loader: Loader) -> t.Tuple[EditList, int]:
+    """
+    Reads beats from a beat file. Embedded signals are memory-mapped rather than read, so only the samples that are
+    actually used get loaded. The index is checked against the signal, so malformed files raise a ValueError here
+    rather than failing when the beats are rendered.
+
+    :param path: Path to the beat file.
+    :param loader: Loader used to decode the source song, if the signal isn't embedded.
+    :return: A tuple of the beats and their sample rate.
+    """
+    path = Path(path)
+    with open(path, "rb") as fp:
+        preamble = fp.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size or preamble[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a beat file, it may have been created by an older version")
+
+        _, version, header_size = _PREAMBLE.unpack(preamble)
+        if version not in _INDEX_ROWS:
+            raise ValueError(f"{path} has unsupported version {version}, expected at most {VERSION}")
+
+        header = _parse_header(path, fp.read(header_size))
+        index_offset = _align(_PREAMBLE.size + header_size)
+        fp.seek(index_offset)
+        rows = _INDEX_ROWS[version]
+        index = np.fromfile(fp, dtype="<i8", count=rows * header["beats"])
+        if len(index) != rows * header["beats"]:
+            raise ValueError(f"{path} is truncated")
+
+    sample_rate = header["sample_rate"]
+    try:
+        dtype = np.dtype(header["dtype"])
+    except TypeError:
+        # NumPy raises TypeError for strings that don't name a dtype.
+        dtype = None
+    if dtype is None or dtype.newbyteorder("=") not in SAMPLE_FORMATS:
+        raise ValueError(f"{path} has unsupported sample format {header['dtype']}")
+
+    shape = (header["frames"], header["channels"])
+    index = index.reshape(rows, header["beats"])
+    _validate_index(path, index, shape[0], sample_rate)
+
+    if header["source"] is not None:
+        signal, source_sample_rate = loader.load(resolve_source(path, header["source"]), dtype.newbyteorder("="))
+        if source_sample_rate != sample_rate or signal.shape != shape:
+            raise ValueError(f"{header['source']} has changed since {path} was written")
+    elif shape[0] == 0:
+        signal = np.empty(shape, dtype=dtype)
+    else:
+        signal = np.memmap(path, dtype=dtype, mode="r", offset=_align(index_offset + index.nbytes), shape=shape)
+
+    return EditList(signal, *index), sample_rate
@@ -1,39 +1,166 @@
+import asyncio
+import inspect
+import os
 import subprocess
+import tempfile
+import threading
 import typing as t
+from concurrent.futures import Executor, ThreadPoolExecutor
 from functools import reduce
 from pathlib import Path
 
 import numpy as np
-from madmom.audio import Signal
 
-from .backend import Backend
-from .backends.madmom import MadmomDbnBackend
+from . import profiling
+from .backend import Backend, StreamingBackend
+from .beat_file import read_beat_file, write_beat_file
+from .cache import BeatCache, backend_params
+from .edit_list import EditList, Segment, collect, iter_segments, trim_beats
 from .effect_registry import Effect
+from .loader import Loader, load_many
+from .loaders.ffmpeg import FfmpegLoader
+from .loaders.soundfile import SoundfileLoader
+from .plan import RenderPlan
+from .utils import SAMPLE_FORMATS, sample_dtype
 
-_DEFAULT_BACKEND = MadmomDbnBackend(model_count=4)  # TODO: 2 might be sufficient, test more
+# Created on first use, since importing madmom is slow.
+_default_backend = None
+_default_backend_lock = threading.Lock()
 
+# libsndfile is fast but, depending on the version installed, may not support MP3. Anything it can't read is decoded
+# by ffmpeg instead.
+_DEFAULT_LOADER = SoundfileLoader(fallback=FfmpegLoader())
 
-def _load_audio(path: Path) -> t.Tuple[int, np.array]:
-    # TODO: Revisit python-soundfile once it bundles a recent version of libsndfile on linux:
-    #       https://github.com/bastibe/python-soundfile/issues/353. (Most distros still have a libsndfile version
-    #       that doesn't support MP3. Users could always build from source but we don't want that to be a requirement.)
-    s = Signal(str(path), sample_rate=None, num_channels=None, dtype=np.float64)
-    return s, s.sample_rate
+# Upper bound on how much raw audio is buffered in memory before being written to ffmpeg.
+_PIPE_BUFFER_SIZE = 1 << 20
+
+# Number of samples resampled at once for analysis, which bounds the memory used by temporary arrays.
+_RESAMPLE_BLOCK_SIZE = 1 << 16
+
+
+def _get_default_backend() -> Backend:
+    global _default_backend
+    if _default_backend is None:
+        with _default_backend_lock:
+            if _default_backend is None:
+                from .backends.madmom import MadmomDbnBackend
+
+                _default_backend = MadmomDbnBackend(model_count=4)  # TODO: 2 might be sufficient, test more
+
+    return _default_backend
+
+
+def _analysis_signal(backend: Backend, signal: np.ndarray, sample_rate: int) -> t.Tuple[np.ndarray, int]:
+    """
+    Downmixes and resamples a signal to the backend's preferred analysis format. Returns the signal untouched if the
+    backend doesn't declare one.
+    """
+    analysis_sample_rate = getattr(backend, "analysis_sample_rate", None) or sample_rate
+    analysis_channels = getattr(backend, "analysis_channels", None)
+
+    if analysis_sample_rate == sample_rate and (analysis_channels is None or analysis_channels == signal.shape[1]):
+        return signal, sample_rate
+
+    if np.issubdtype(signal.dtype, np.integer):
+        analysis = signal.astype(np.float32) / np.iinfo(signal.dtype).max
+    else:
+        analysis = signal.astype(np.float32, copy=False)
+
+    if analysis_channels == 1:
+        analysis = analysis.mean(axis=1)
+    elif analysis_channels is not None and analysis_channels != signal.shape[1]:
+        raise ValueError(f"can't convert {signal.shape[1]} channels to {analysis_channels} for analysis")
+
+    if analysis_sample_rate != sample_rate:
+        analysis = _resample(analysis, sample_rate, analysis_sample_rate)
+
+    return analysis, analysis_sample_rate
+
+
+def _resample(signal: np.ndarray, sample_rate: int, new_sample_rate: int) -> np.ndarray:
+    """
+    Cheaply resamples a signal by averaging the samples each new sample spans, which is a box filter followed by linear
+    interpolation. It aliases far more than a proper polyphase resampler, but beat detection only looks at onsets.
+    """
+    ratio = sample_rate / new_sample_rate
+    length = -(-len(signal) * new_sample_rate // sample_rate)
+    half_width = max(ratio, 1) / 2
+
+    columns = signal.reshape(len(signal), -1)
+    resampled = np.empty((length, columns.shape[1]), dtype=np.float32)
+
+    # The song is resampled a block at a time, so temporary arrays stay small however long it is.
+    for start in range(0, length, _RESAMPLE_BLOCK_SIZE):
+        positions = np.arange(start, min(start + _RESAMPLE_BLOCK_SIZE, length)) * ratio
+        lower = np.clip(positions - half_width, 0, len(signal))
+        upper = np.clip(positions + half_width, 0, len(signal))
+
+        # Interpolating the running sum gives the exact integral of the signal over any span, including fractional ones.
+        first, last = int(lower[0]), int(np.ceil(upper[-1]))
+        sums = np.zeros((last - first + 1, columns.shape[1]))
+        np.cumsum(columns[first:last], axis=0, dtype=np.float64, out=sums[1:])
+        offsets = np.arange(first, last + 1)
+
+        for channel in range(columns.shape[1]):
+            integrals = np.interp(upper, offsets, sums[:, channel]) - np.interp(lower, offsets, sums[:, channel])
+            resampled[start : start + len(positions), channel] = integrals / (upper - lower)
+
+    return resampled.reshape((length,) + signal.shape[1:])
+
+
+def _load_audio(path: Path, dtype: t.Any = np.float64, loader: Loader = None) -> t.Tuple[np.ndarray, int]:
+    with profiling.stage("load", str(path)) as stage:
+        signal, sample_rate = (loader or _DEFAULT_LOADER).load(path, sample_dtype(dtype))
+        if profiling.enabled() and os.path.isfile(path):
+            stage.bytes_in = os.path.getsize(path)
+        stage.bytes_out = signal.nbytes
+
+    return signal, sample_rate
+
+
+def _effect_name(effect: Effect) -> str:
+    return getattr(effect, "__effect_name__", type(effect).__name__)
 
 
 class Beats:
     """
     The Beats class is a convenient immutable wrapper for applying effects to songs.
+
+    Beats loaded with ``from_song`` are stored as an EditList: one contiguous signal plus the boundaries of each beat.
+    Effects then operate on lightweight Segments of that signal, so sample data is only copied when rendering.
+
+    Beats created with ``streaming=True`` are lazy: beats are located while they are being applied or saved, and can
+    only be consumed once.
+
+    Samples are kept in a single dtype (float64, float32 or int16) all the way from loading to saving. Smaller dtypes
+    reduce memory use and the amount of data piped to ffmpeg.
     """
 
     _sample_rate: int
     _channels: int
-    _beats: t.List[np.ndarray]
+    _beats: t.Union[EditList, t.List[np.ndarray]]
+    _dtype: np.dtype
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int,
+        beats: t.Union[EditList, t.List[np.ndarray]],
+        dtype: t.Any = None,
+    ):
+        """
+        :param sample_rate: Audio sample rate.
+        :param channels: Number of audio channels.
+        :param beats: Beats as an EditList or a list of ndarrays with shape (samples, channels).
+        :param dtype: Sample dtype used when saving. Defaults to the dtype of the EditList's source, or float64.
+        """
+        if dtype is None:
+            dtype = beats.source.dtype if isinstance(beats, EditList) else np.float64
 
-    def __init__(self, sample_rate: int, channels: int, beats: t.List[np.ndarray]):
         self._sample_rate = sample_rate
         self._channels = channels
         self._beats = beats
+        self._dtype = sample_dtype(dtype)
 
     def apply(self, effect: Effect) -> "Beats":
         """
@@ -42,22 +169,78 @@ class Beats:
         :param effect: Effect to apply.
         :return: A new Beats object with the given effect applied.
         """
-        return Beats(self._sample_rate, self._channels, list(effect(self._beats)))
+        return self.apply_all(effect)
 
     def apply_all(self, *effects_list: t.List[Effect]) -> "Beats":
         """
         Applies a list of effects and returns a new Beats object.
         This is the best way to apply multiple effects, since it only collects
-        them into a list at the very end.
+        them at the very end.
 
         :param effects_list: Effects to apply in order.
         :return: A new Beats object with the given effects applied.
         """
-        return Beats(
-            self._sample_rate,
-            self._channels,
-            reduce(lambda beats, effect: effect(beats), effects_list, self._beats),
-        )
+        # Lazy beats can't be measured, since nothing happens until they're consumed.
+        if not profiling.enabled() or isinstance(self._beats, t.Iterator):
+            return self._with_beats(reduce(lambda beats, effect: effect(beats), effects_list, self._beats))
+
+        # While profiling, beats are collected after each effect so time is attributed to the effect that spent it.
+        beats = self._beats
+        for effect in effects_list:
+            with profiling.stage("effect", _effect_name(effect)) as stage:
+                stage.beats_in = len(beats)
+                beats = collect(effect(beats))
+                stage.beats_out = len(beats)
+
+        return Beats(self._sample_rate, self._channels, beats, self._dtype)
+
+    def _with_beats(self, beats: t.Iterable) -> "Beats":
+        # Lazy beats stay lazy, so they can be streamed straight into save().
+        if not isinstance(self._beats, t.Iterator):
+            beats = collect(beats)
+        return Beats(self._sample_rate, self._channels, beats, self._dtype)
+
+    def trim(self, start: float = 0, end: float = None) -> "Beats":
+        """
+        Keeps only part of these beats, e.g. to preview the start of a remix. Beats that straddle either end are cut,
+        and nothing outside the range is rendered when the result is saved.
+
+        Lazy beats stay lazy, and stop being consumed once ``end`` is reached. For beats loaded with ``streaming=True``,
+        beats after ``end`` are never located, unless an effect such as randomize needs every beat.
+
+        :param start: Time to start at, in seconds.
+        :param end: Time to end at, in seconds. Defaults to the end of the beats.
+        :return: A new Beats object covering only the given time range.
+        """
+        first = int(round(start * self._sample_rate))
+        last = None if end is None else int(round(end * self._sample_rate))
+
+        beats = self._beats
+        if isinstance(beats, EditList):
+            # Find the overlapping beats up front, so only those are iterated over.
+            lengths = beats.lengths
+            stops = np.cumsum(lengths)
+            overlapping = stops > first
+            if last is not None:
+                overlapping &= stops - lengths < last
+
+            indices = np.flatnonzero(overlapping)
+            offset = int(stops[indices[0]] - lengths[indices[0]]) if len(indices) else 0
+            beats = beats.take(indices)
+            first -= offset
+            last = None if last is None else last - offset
+
+        return self._with_beats(trim_beats(beats, first, last))
+
+    def compile(self, *effects_list: t.List[Effect]) -> RenderPlan:
+        """
+        Applies a list of effects and compiles the result into a flat RenderPlan instead of a new Beats object. The
+        plan fuses beats that are still contiguous in the source signal, and renders the output in a single pass.
+
+        :param effects_list: Effects to apply in order.
+        :return: A RenderPlan that produces the same audio as ``apply_all(*effects_list).to_ndarray()``.
+        """
+        return RenderPlan.compile(reduce(lambda beats, effect: effect(beats), effects_list, self._beats))
 
     def to_ndarray(self) -> np.ndarray:
         """
@@ -65,16 +248,40 @@ class Beats:
 
         :return: An ndarray with shape (samples, channels).
         """
+        if isinstance(self._beats, EditList):
+            return self._beats.render()
+
         return np.concatenate(list(self._beats), axis=0)
 
+    def to_beat_file(self, path: t.Union[str, Path], source: t.Union[str, Path] = None):
+        """
+        Saves these beats to a beat file, which ``from_beat_file`` can open again without locating beats.
+
+        :param path: Path to write to.
+        :param source: If given, the song these beats were loaded from. The beat file then refers to the song instead of
+                       embedding its audio. Only valid for Beats loaded with ``from_song`` and no effects applied, and
+                       the song must be in the same directory as ``path`` or below it.
+        """
+        beats = self._beats
+        if not isinstance(beats, EditList):
+            if source is not None:
+                raise ValueError("only unmodified beats can refer to their source song")
+
+            beats = [np.asarray(beat, dtype=self._dtype) for beat in beats]
+            lengths = np.array([len(beat) for beat in beats], dtype=np.int64)
+            signal = np.concatenate(beats, axis=0) if beats else np.empty((0, self._channels), dtype=self._dtype)
+            beats = EditList.from_boundaries(signal, np.cumsum(lengths)[:-1])
+
+        write_beat_file(path, self._sample_rate, beats, source)
+
     def _create_ffmpeg_command(self, dst: str, out_format: str = None, extra_args: t.List[str] = None):
         cmd = [
             # fmt: off
             "ffmpeg",
             "-hide_banner",
-            "-loglevel", "panic",
+            "-loglevel", "error",
             "-y",
-            "-f", "f64le",
+            "-f", SAMPLE_FORMATS[self._dtype],
             "-ar", str(self._sample_rate),
             "-ac", str(self._channels),
             "-i", "-",
@@ -90,36 +297,256 @@ class Beats:
         cmd.append(dst)
         return cmd
 
-    def _save_to_file(self, filename: str, out_format: str = None, extra_ffmpeg_args: t.List[str] = None):
-        p = subprocess.Popen(
-            self._create_ffmpeg_command(filename, out_format, extra_ffmpeg_args),
-            stdin=subprocess.PIPE,
-        )
-        p.communicate(input=self.to_ndarray().tobytes())
-        p.stdin.close()
-        p.wait()
+    def _write_samples(self, stream: t.BinaryIO) -> int:
+        """
+        Writes raw samples to a stream one beat at a time, so the whole song never has to be rendered at once. Returns
+        the number of bytes written.
+        """
+        written = 0
+        try:
+            for beat in self._beats:
+                # Repeated segments are written once per repetition, rather than being repeated in memory first.
+                for block in beat.blocks() if isinstance(beat, Segment) else (beat,):
+                    data = np.ascontiguousarray(block, dtype=self._dtype).data
+                    stream.write(data)
+                    written += data.nbytes
+        except BrokenPipeError:
+            # ffmpeg exited early; its exit code and error output say why.
+            pass
+        finally:
+            try:
+                stream.close()
+            except BrokenPipeError:
+                # Closing flushes whatever is still buffered, which fails the same way if ffmpeg has exited.
+                pass
+
+        return written
+
+    @staticmethod
+    def _check_ffmpeg(returncode: int, cmd: t.List[str], log: t.BinaryIO) -> None:
+        # ffmpeg's error output goes to a temporary file rather than a pipe, so it can never fill up and stall ffmpeg.
+        if returncode != 0:
+            log.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=log.read().decode(errors="replace").strip())
 
-    def _save_to_binary_io(self, fp: t.BinaryIO, out_format: str = None, extra_ffmpeg_args: t.List[str] = None):
+    def _save_to_file(self, filename: str, out_format: str = None, extra_ffmpeg_args: t.List[str] = None) -> int:
+        cmd = self._create_ffmpeg_command(filename, out_format, extra_ffmpeg_args)
+        with tempfile.TemporaryFile() as log:
+            with subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=log, bufsize=_PIPE_BUFFER_SIZE) as p:
+                piped = self._write_samples(p.stdin)
+
+            self._check_ffmpeg(p.returncode, cmd, log)
+
+        return piped
+
+    def _save_to_binary_io(
+        self, fp: t.BinaryIO, out_format: str = None, extra_ffmpeg_args: t.List[str] = None
+    ) -> t.Tuple[int, int]:
         if not out_format:
             raise ValueError("out_format is required when writing to file-like object")
 
-        p = subprocess.Popen(
-            self._create_ffmpeg_command("pipe:", out_format, extra_ffmpeg_args),
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-        )
+        cmd = self._create_ffmpeg_command("pipe:", out_format, extra_ffmpeg_args)
+        with tempfile.TemporaryFile() as log:
+            with subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log,
+                bufsize=_PIPE_BUFFER_SIZE,
+            ) as p:
+                # stdin is fed from a separate thread so ffmpeg can never block on a full stdout pipe.
+                errors = []
+                piped = []
+
+                def feed():
+                    try:
+                        piped.append(self._write_samples(p.stdin))
+                    except BaseException as e:
+                        errors.append(e)
+                        p.kill()
+
+                writer = threading.Thread(target=feed, daemon=True)
+                writer.start()
+
+                # Encoded audio is forwarded as soon as ffmpeg produces it, rather than once encoding has finished.
+                written = 0
+                try:
+                    while chunk := p.stdout.read1(_PIPE_BUFFER_SIZE):
+                        # Some writers, such as Django's HttpResponse, return None rather than a byte count.
+                        fp.write(chunk)
+                        written += len(chunk)
+                except BaseException:
+                    p.kill()
+                    raise
+                finally:
+                    writer.join()
+
+            if errors:
+                raise errors[0]
+
+            self._check_ffmpeg(p.returncode, cmd, log)
+
+        return piped[0], written
+
+    def save(
+        self,
+        fp,
+        out_format=None,
+        extra_ffmpeg_args: t.List[str] = None,
+        time_range: t.Tuple[float, t.Optional[float]] = None,
+    ):
+        if time_range is not None:
+            return self.trim(*time_range).save(fp, out_format, extra_ffmpeg_args)
+
+        with profiling.stage("save", fp if isinstance(fp, str) else out_format) as stage:
+            if not isinstance(self._beats, t.Iterator):
+                stage.beats_in = len(self._beats)
+
+            if isinstance(fp, str):
+                stage.bytes_in = self._save_to_file(fp, out_format, extra_ffmpeg_args)
+                if profiling.enabled() and os.path.isfile(fp):
+                    stage.bytes_out = os.path.getsize(fp)
+                return None
+
+            stage.bytes_in, stage.bytes_out = self._save_to_binary_io(fp, out_format, extra_ffmpeg_args)
+            return stage.bytes_out
+
+    async def _write_samples_async(self, stream: asyncio.StreamWriter, executor: t.Optional[Executor]) -> int:
+        """
+        Like ``_write_samples``, but waits for ffmpeg to accept each block instead of blocking. Lazy beats are located
+        on the executor, since that is CPU-bound.
+        """
+        loop = asyncio.get_running_loop()
+        lazy = isinstance(self._beats, t.Iterator)
+        beats = iter(self._beats)
+
+        written = 0
+        try:
+            while True:
+                beat = await loop.run_in_executor(executor, next, beats, None) if lazy else next(beats, None)
+                if beat is None:
+                    break
+
+                for block in beat.blocks() if isinstance(beat, Segment) else (beat,):
+                    data = np.ascontiguousarray(block, dtype=self._dtype).data
+                    stream.write(data)
+                    written += data.nbytes
+                    await stream.drain()
+
+            stream.close()
+            await stream.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            # As in _write_samples, ffmpeg exited early.
+            pass
+
+        return written
+
+    async def save_async(
+        self,
+        fp,
+        out_format: str = None,
+        extra_ffmpeg_args: t.List[str] = None,
+        executor: Executor = None,
+        time_range: t.Tuple[float, t.Optional[float]] = None,
+    ) -> t.Optional[int]:
+        """
+        Saves these beats like ``save``, without blocking the event loop. ffmpeg runs as an asyncio subprocess, and is
+        killed if saving is cancelled.
+
+        :param fp: Path to save to, or a file-like object to write encoded audio to. Its ``write`` method may be a
+                   coroutine, such as an aiohttp ``StreamResponse``'s.
+        :param out_format: Output format. Required when writing to a file-like object.
+        :param extra_ffmpeg_args: Extra arguments passed to ffmpeg.
+        :param executor: Executor to locate lazy beats on. Defaults to the event loop's default executor.
+        :param time_range: If given, a ``(start, end)`` pair of times in seconds, as for ``trim``. Only that part of the
+                           output is rendered and saved.
+        :return: Number of encoded bytes written to ``fp``, or None if ``fp`` is a path.
+        """
+        if time_range is not None:
+            return await self.trim(*time_range).save_async(fp, out_format, extra_ffmpeg_args, executor)
+
+        to_file = isinstance(fp, str)
+        if not to_file and not out_format:
+            raise ValueError("out_format is required when writing to file-like object")
+
+        cmd = self._create_ffmpeg_command(fp if to_file else "pipe:", out_format, extra_ffmpeg_args)
+        with profiling.stage("save", fp if to_file else out_format) as stage, tempfile.TemporaryFile() as log:
+            if not isinstance(self._beats, t.Iterator):
+                stage.beats_in = len(self._beats)
+
+            p = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.PIPE,
+                stdout=None if to_file else subprocess.PIPE,
+                stderr=log,
+                limit=_PIPE_BUFFER_SIZE,
+            )
+            writer = asyncio.ensure_future(self._write_samples_async(p.stdin, executor))
+            try:
+                written = 0
+                if not to_file:
+                    while chunk := await p.stdout.read(_PIPE_BUFFER_SIZE):
+                        result = fp.write(chunk)
+                        if inspect.isawaitable(result):
+                            await result
+                        written += len(chunk)
+                    stage.bytes_out = written
+
+                stage.bytes_in = await writer
+                await p.wait()
+            except BaseException:
+                if p.returncode is None:
+                    p.kill()
+                writer.cancel()
+                await asyncio.gather(writer, p.wait(), return_exceptions=True)
+                raise
+
+            self._check_ffmpeg(p.returncode, cmd, log)
+
+            if to_file and profiling.enabled() and os.path.isfile(fp):
+                stage.bytes_out = os.path.getsize(fp)
+
+            return None if to_file else written
+
+    def save_all(
+        self,
+        outputs: t.Iterable[t.Tuple[t.Sequence[Effect], t.Any]],
+        out_format: str = None,
+        extra_ffmpeg_args: t.List[str] = None,
+        max_workers: int = 4,
+        compiled: bool = False,
+        time_range: t.Tuple[float, t.Optional[float]] = None,
+    ) -> t.List:
+        """
+        Applies several effect chains to these beats and saves each result. Every chain works on the same decoded
+        signal, and the outputs are encoded by concurrent ffmpeg processes.
+
+        :param outputs: Pairs of an effect chain and where to save its result, as accepted by ``save``.
+        :param out_format: Output format, as for ``save``.
+        :param extra_ffmpeg_args: Extra arguments passed to every ffmpeg process.
+        :param max_workers: Maximum number of outputs encoded at once.
+        :param compiled: If set, each chain is compiled into a RenderPlan and rendered in a single pass before encoding.
+        :param time_range: If given, a ``(start, end)`` pair of times in seconds, as for ``trim``. Only that part of
+                           each output is rendered and saved.
+        :return: The result of ``save`` for each output, in order.
+        """
+        if isinstance(self._beats, t.Iterator):
+            raise ValueError("lazy beats can only be saved once")
 
-        stdout, _ = p.communicate(input=self.to_ndarray().tobytes())
-        p.stdin.close()
-        p.wait()
+        def render(output):
+            effects, fp = output
+            beats = self
+            if time_range is not None:
+                beats, effects = self.apply_all(*effects).trim(*time_range), ()
 
-        return fp.write(stdout)
+            if compiled:
+                beats = Beats(self._sample_rate, self._channels, [beats.compile(*effects).render()], self._dtype)
+            else:
+                beats = beats.apply_all(*effects)
+            return beats.save(fp, out_format, extra_ffmpeg_args)
 
-    def save(self, fp, out_format=None, extra_ffmpeg_args: t.List[str] = None):
-        if isinstance(fp, str):
-            return self._save_to_file(fp, out_format, extra_ffmpeg_args)
-        else:
-            return self._save_to_binary_io(fp, out_format, extra_ffmpeg_args)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(render, outputs))
 
     @property
     def sample_rate(self):
@@ -135,16 +562,178 @@ class Beats:
         """
         return self._channels
 
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        :return: Sample dtype.
+        """
+        return self._dtype
+
+    @staticmethod
+    def from_beat_locations(signal: np.ndarray, sample_rate: int, beat_locations: np.ndarray) -> "Beats":
+        """
+        Splits an already decoded signal at known beat locations.
+
+        :param signal: Signal with shape (samples, channels).
+        :param sample_rate: Sample rate of the signal.
+        :param beat_locations: Sample index at which each beat starts.
+        :return: A new Beats object.
+        """
+        signal = np.asarray(signal)
+        if signal.ndim == 1:
+            signal = signal.reshape(-1, 1)
+
+        return Beats(sample_rate, signal.shape[1], EditList.from_boundaries(signal, beat_locations))
+
+    @staticmethod
+    def from_signal(signal: np.ndarray, sample_rate: int, backend: Backend = None, streaming: bool = False) -> "Beats":
+        """
+        Locates beats in an already decoded signal.
+
+        :param signal: Signal with shape (samples, channels).
+        :param sample_rate: Sample rate of the signal.
+        :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+        :param streaming: If set and the backend supports it, returns lazy Beats that locate beats incrementally.
+        :return: A new Beats object.
+        """
+        backend = backend or _get_default_backend()
+
+        signal = np.asarray(signal)
+        if signal.ndim == 1:
+            signal = signal.reshape(-1, 1)
+
+        if streaming and hasattr(backend, "iter_beats"):
+            analysis, analysis_sample_rate = _analysis_signal(backend, signal, sample_rate)
+            beat_locations = (
+                location * sample_rate // analysis_sample_rate
+                for location in t.cast(StreamingBackend, backend).iter_beats(analysis, analysis_sample_rate)
+            )
+            return Beats(sample_rate, signal.shape[1], iter_segments(signal, beat_locations), signal.dtype)
+
+        with profiling.stage("detect", type(backend).__name__) as stage:
+            # The backend gets a cheaper copy of the signal, while the original is kept for rendering.
+            analysis, analysis_sample_rate = _analysis_signal(backend, signal, sample_rate)
+            beat_locations = np.array(backend.locate_beats(analysis, analysis_sample_rate)).astype(np.int64)
+            beats = Beats.from_beat_locations(signal, sample_rate, beat_locations * sample_rate // analysis_sample_rate)
+            stage.bytes_in = analysis.nbytes
+            stage.beats_out = len(beats._beats)
+
+        return beats
+
+    @staticmethod
+    def from_song(
+        fp: t.Union[str, Path],
+        backend: Backend = None,
+        dtype: t.Any = np.float64,
+        loader: Loader = None,
+        streaming: bool = False,
+        cache: BeatCache = None,
+    ) -> "Beats":
+        """
+        Loads a song and locates its beats.
+
+        :param fp: Path to the song.
+        :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+        :param dtype: Sample dtype to load the song with, one of float64, float32 or int16.
+        :param loader: Loader used to decode the song. Defaults to libsndfile, falling back to ffmpeg.
+        :param streaming: If set and the backend supports it, returns lazy Beats that locate beats incrementally.
+        :param cache: If given, beat locations are looked up in and saved to this cache. Ignored when streaming.
+        :return: A new Beats object.
+        """
+        backend = backend or _get_default_backend()
+        signal, sample_rate = _load_audio(fp, dtype, loader)
+        return Beats._from_decoded_song(fp, signal, sample_rate, backend, streaming, cache)
+
     @staticmethod
-    def from_song(fp: t.Union[str, t.BinaryIO], backend: Backend = None) -> "Beats":
-        backend = backend or _DEFAULT_BACKEND
+    async def from_song_async(
+        fp: t.Union[str, Path],
+        backend: Backend = None,
+        dtype: t.Any = np.float64,
+        loader: Loader = None,
+        streaming: bool = False,
+        cache: BeatCache = None,
+        executor: Executor = None,
+    ) -> "Beats":
+        """
+        Loads a song and locates its beats like ``from_song``, without blocking the event loop. Decoding and beat
+        detection each run on the executor. Cancelling stops before the next of them starts, but one that is already
+        running finishes in the background.
+
+        :param fp: Path to the song.
+        :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+        :param dtype: Sample dtype to load the song with, one of float64, float32 or int16.
+        :param loader: Loader used to decode the song. Defaults to libsndfile, falling back to ffmpeg.
+        :param streaming: If set and the backend supports it, returns lazy Beats that locate beats incrementally.
+        :param cache: If given, beat locations are looked up in and saved to this cache. Ignored when streaming.
+        :param executor: Executor to run decoding and beat detection on. Defaults to the event loop's default executor.
+        :return: A new Beats object.
+        """
+        loop = asyncio.get_running_loop()
+        backend = backend or await loop.run_in_executor(executor, _get_default_backend)
+        signal, sample_rate = await loop.run_in_executor(executor, _load_audio, fp, dtype, loader)
+        return await loop.run_in_executor(
+            executor, Beats._from_decoded_song, fp, signal, sample_rate, backend, streaming, cache
+        )
 
-        signal, sample_rate = _load_audio(fp)
+    @staticmethod
+    def _from_decoded_song(
+        fp: t.Union[str, Path],
+        signal: np.ndarray,
+        sample_rate: int,
+        backend: Backend,
+        streaming: bool,
+        cache: t.Optional[BeatCache],
+    ) -> "Beats":
+        if cache is None or streaming:
+            return Beats.from_signal(signal, sample_rate, backend, streaming)
+
+        metadata = {"sample_rate": sample_rate, "frames": len(signal)}
+        with profiling.stage("cache", str(fp)) as stage:
+            key = cache.key(fp, backend_params(backend))
+            entry = cache.get(key)
+            hit = entry is not None and entry[1] == metadata
+            if hit:
+                beats = Beats.from_beat_locations(signal, sample_rate, entry[0])
+                stage.beats_out = len(beats._beats)
+
+        if hit:
+            return beats
+
+        beats = Beats.from_signal(signal, sample_rate, backend)
+        cache.put(key, beats._beats.starts[1:], metadata)
+        return beats
 
-        channels = 1
-        if len(signal.shape) >= 1:
-            channels = signal.shape[1]
+    @staticmethod
+    def from_beat_file(fp: t.Union[str, Path], loader: Loader = None) -> "Beats":
+        """
+        Opens a beat file created by ``to_beat_file``. Embedded audio is memory-mapped, so opening is instant and only
+        the parts of the song that are rendered are ever read.
 
-        beat_locations = np.array(backend.locate_beats(signal, sample_rate)).astype(np.int64)
+        :param fp: Path to the beat file.
+        :param loader: Loader used to decode the song, if the beat file refers to one. Defaults to libsndfile, falling
+                       back to ffmpeg.
+        :return: A new Beats object.
+        """
+        beats, sample_rate = read_beat_file(fp, loader or _DEFAULT_LOADER)
+        return Beats(sample_rate, beats.source.shape[1], beats, beats.source.dtype.newbyteorder("="))
 
-        return Beats(sample_rate, channels, np.split(signal, beat_locations))
+    @staticmethod
+    def from_songs(
+        paths: t.Iterable[t.Union[str, Path]],
+        backend: Backend = None,
+        dtype: t.Any = np.float64,
+        loader: Loader = None,
+        max_workers: int = None,
+    ) -> t.List["Beats"]:
+        """
+        Loads several songs, decoding them concurrently, and locates their beats.
+
+        :param paths: Paths to the songs.
+        :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+        :param dtype: Sample dtype to load the songs with, one of float64, float32 or int16.
+        :param loader: Loader used to decode the songs. Defaults to libsndfile, falling back to ffmpeg.
+        :param max_workers: Maximum number of songs decoded at once.
+        :return: A new Beats object for each song, in order.
+        """
+        decoded = load_many(loader or _DEFAULT_LOADER, paths, sample_dtype(dtype), max_workers)
+        return [Beats.from_signal(signal, sample_rate, backend) for signal, sample_rate in decoded]
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import typing as t
+from pathlib import Path
+
+import numpy as np
+
+# Bump whenever the layout of cache entries or keys changes.
+_FORMAT_VERSION = 1
+
+_SUFFIX = ".npz"
+_FINGERPRINT_SUFFIX = ".fingerprint"
+
+# Older versions pickled whole songs into files named after the MD5 of the song's path, with no suffix. They share the
+# cache directory, but are never read.
+_LEGACY_ENTRY = re.compile(r"[0-9a-f]{32}")
+
+
+def fingerprint(path: t.Union[str, Path]) -> str:
+    """
+    Hashes the contents of a file. The file is memory-mapped and hashed with SHA-256 in a single call, which is
+    hardware-accelerated on most CPUs.
+
+    :param path: Path to the file.
+    :return: A hex digest of the file's contents.
+    """
+    with open(path, "rb") as fp:
+        try:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+        except (ValueError, OSError):
+            # Empty files and special files can't be mapped.
+            return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def backend_params(backend) -> dict:
+    """
+    Describes the parameters of a backend that affect the beats it locates.
+
+    Backends can define a ``cache_params`` attribute to control this. Otherwise, all of a backend's public
+    attributes are used.
+
+    :param backend: Backend to describe.
+    :return: A JSON-serializable dict.
+    """
+    params = getattr(backend, "cache_params", None)
+    if params is None:
+        params = {k: v for k, v in vars(backend).items() if not k.startswith("_")}
+
+    return {"backend": f"{type(backend).__module__}.{type(backend).__qualname__}", **params}
+
+
+class BeatCache:
+    """
+    A BeatCache stores beat locations on disk, so songs don't have to be analysed twice. Only beat positions and a
+    little metadata are stored, never audio.
+
+    Entries are keyed on the contents of the song and the parameters used to locate its beats. Once the cache grows
+    beyond ``max_bytes``, the least recently used entries are evicted. Entries are written atomically, so a cache
+    directory can be shared by concurrent processes.
+    """
+
+    def __init__(self, directory: t.Union[str, Path], max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param directory: Directory to store entries in. Created if it doesn't exist.
+        :param max_bytes: Maximum total size of all entries.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def fingerprint(self, path: t.Union[str, Path], trust_stat: bool = True) -> str:
+        """
+        Hashes the contents of a file, like ``fingerprint``, but remembers the result.
+
+        If ``trust_stat`` is set, a file whose device, inode, size, modification time and change time all match a
+        previously hashed file is assumed to be unchanged, and its recorded hash is returned without reading it.
+        Otherwise, or if anything differs, the file is hashed in full.
+
+        :param path: Path to the file.
+        :param trust_stat: Whether to reuse hashes of files that appear unchanged.
+        :return: A hex digest of the file's contents.
+        """
+        stat = os.stat(path)
+        identity = f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ctime_ns}"
+        recorded = self.directory / (hashlib.sha256(identity.encode()).hexdigest() + _FINGERPRINT_SUFFIX)
+
+        if trust_stat:
+            try:
+                digest = recorded.read_text()
+                os.utime(recorded)
+                return digest
+            except OSError:
+                pass
+
+        digest = fingerprint(path)
+        self._write_atomic(recorded, lambda fp: fp.write(digest.encode()))
+        return digest
+
+    def key(self, song_file: t.Union[str, Path], params: dict) -> str:
+        """
+        Computes the cache key for a song.
+
+        :param song_file: Path to the song.
+        :param params: Anything else that affects the located beats, such as the output of ``backend_params``.
+        :return: A hex string identifying the song and parameters.
+        """
+        digest = self.fingerprint(song_file)
+        description = json.dumps({"version": _FORMAT_VERSION, "song": digest, "params": params}, sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + _SUFFIX)
+
+    def _write_atomic(self, path: Path, write: t.Callable[[t.BinaryIO], t.Any]):
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=path.suffix)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                write(fp)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def get(self, key: str) -> t.Optional[t.Tuple[np.ndarray, dict]]:
+        """
+        Looks up an entry, marking it as recently used.
+
+        :param key: Key from ``BeatCache.key``.
+        :return: A tuple of beat locations and metadata, or None if there is no entry for the given key.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                beat_locations = entry["beats"]
+                metadata = json.loads(str(entry["metadata"]))
+            os.utime(path)
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+        return beat_locations, metadata
+
+    def put(self, key: str, beat_locations: np.ndarray, metadata: dict = None):
+        """
+        Stores an entry, then evicts old entries if the cache is over budget.
+
+        :param key: Key from ``BeatCache.key``.
+        :param beat_locations: Beat locations to store.
+        :param metadata: JSON-serializable metadata to store alongside them.
+        """
+        self._write_atomic(
+            self._path(key),
+            lambda fp: np.savez(
+                fp,
+                beats=np.asarray(beat_locations, dtype=np.int64),
+                metadata=np.array(json.dumps(metadata or {})),
+            ),
+        )
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used entries and recorded fingerprints until the cache fits within its budget. Entries
+        left by older versions are always removed.
+        """
+        entries = []
+        for path in self.directory.iterdir():
+            if _LEGACY_ENTRY.fullmatch(path.name):
+                path.unlink(missing_ok=True)
+                continue
+            if path.name.startswith(".tmp-") or path.suffix not in (_SUFFIX, _FINGERPRINT_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,287 @@
+import typing as t
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+def _copy_segment(
+    out: np.ndarray, position: int, source: np.ndarray, start: int, stop: int, step: int, repeats: int
+) -> int:
+    # Writes a segment into out at the given position, returning the position just past it.
+    length = (stop - start) * repeats
+    if step == 0:
+        out[position : position + length] = 0
+        return position + length
+
+    samples = source[start:stop][::step]
+    for _ in range(repeats):
+        out[position : position + stop - start] = samples
+        position += stop - start
+
+    return position
+
+
+class Segment(NDArrayOperatorsMixin):
+    """
+    A Segment is a zero-copy reference to the samples of a single beat: ``source[start:stop]``, played forwards if
+    ``step`` is 1 or backwards if it is -1, ``repeats`` times in a row. A ``step`` of 0 means ``stop - start`` samples
+    of silence, and the source is only used for its dtype and number of channels.
+
+    Slicing a Segment along its first axis (e.g. ``beat[a:b]`` or ``beat[::-1]``) returns another Segment, so effects
+    that only cut, reverse, repeat, silence or rearrange beats never touch sample data. Segments can be used anywhere
+    NumPy expects an array, in which case they are converted into an ndarray, which is a view of the source unless the
+    segment is silent or repeated.
+    """
+
+    __slots__ = ("source", "start", "stop", "step", "repeats")
+
+    def __init__(self, source: np.ndarray, start: int, stop: int, step: int = 1, repeats: int = 1):
+        self.source = source
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.repeats = repeats
+
+    @staticmethod
+    def silence(source: np.ndarray, length: int) -> "Segment":
+        """
+        Creates a silent Segment.
+
+        :param source: Signal whose dtype and channels the silence should have.
+        :param length: Length of the silence in samples.
+        :return: A Segment of ``length`` silent samples.
+        """
+        return Segment(source, 0, length, 0)
+
+    def __len__(self) -> int:
+        return (self.stop - self.start) * self.repeats
+
+    @property
+    def shape(self) -> t.Tuple[int, ...]:
+        return (len(self),) + self.source.shape[1:]
+
+    @property
+    def ndim(self) -> int:
+        return self.source.ndim
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.source.dtype
+
+    def __getitem__(self, key):
+        index, rest = (key[0], key[1:]) if isinstance(key, tuple) and key else (key, ())
+
+        if isinstance(index, slice) and all(k is Ellipsis or k == slice(None) for k in rest):
+            if self.repeats != 1:
+                # Only whole repeated segments can be reversed without copying.
+                if index == slice(None, None, -1):
+                    return Segment(self.source, self.start, self.stop, -self.step, self.repeats)
+                return np.asarray(self)[key]
+
+            played = range(self.start, self.stop)[:: self.step or 1][index]
+            if len(played) == 0:
+                return Segment(self.source, self.start, self.start)
+            if self.step == 0:
+                return Segment.silence(self.source, len(played))
+            if played.step == 1:
+                return Segment(self.source, played.start, played.stop, 1)
+            if played.step == -1:
+                return Segment(self.source, played.stop + 1, played.start + 1, -1)
+
+        return np.asarray(self)[key]
+
+    def blocks(self) -> t.Iterator[np.ndarray]:
+        """
+        Yields the samples of this segment in order, without repeating them in memory.
+
+        :return: A generator yielding ndarrays, which are views of the source unless the segment is silent.
+        """
+        if self.step == 0:
+            yield np.zeros(self.shape, dtype=self.source.dtype)
+            return
+
+        samples = self.source[self.start : self.stop][:: self.step]
+        for _ in range(self.repeats):
+            yield samples
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if self.step != 0 and self.repeats == 1:
+            samples = self.source[self.start : self.stop][:: self.step]
+        else:
+            samples = np.empty(self.shape, dtype=self.source.dtype)
+            _copy_segment(samples, 0, self.source, self.start, self.stop, self.step, self.repeats)
+            copy = False
+
+        if dtype is not None:
+            samples = samples.astype(dtype, copy=False)
+        return samples.copy() if copy else samples
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(np.asarray(x) if isinstance(x, Segment) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __repr__(self) -> str:
+        if self.repeats != 1:
+            return f"Segment({self.start}, {self.stop}, {self.step}, repeats={self.repeats})"
+        return f"Segment({self.start}, {self.stop}, {self.step})"
+
+
+class EditList:
+    """
+    An EditList is a compact sequence of beats. Rather than holding one ndarray per beat, it stores a single source
+    signal and parallel int64 arrays describing each beat as a ``(start, stop, step, repeats)`` segment of that signal.
+
+    Iterating over an EditList yields Segments, which is what effects see when they are applied to it.
+    """
+
+    source: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    steps: np.ndarray
+    repeats: np.ndarray
+
+    def __init__(
+        self,
+        source: np.ndarray,
+        starts: np.ndarray,
+        stops: np.ndarray,
+        steps: np.ndarray = None,
+        repeats: np.ndarray = None,
+    ):
+        self.source = source
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+        self.steps = np.ones_like(self.starts) if steps is None else np.asarray(steps, dtype=np.int64)
+        self.repeats = np.ones_like(self.starts) if repeats is None else np.asarray(repeats, dtype=np.int64)
+
+    @staticmethod
+    def from_boundaries(source: np.ndarray, boundaries: np.ndarray) -> "EditList":
+        """
+        Creates an EditList that splits a signal at the given sample indices. This matches the beats produced by
+        ``np.split(source, boundaries)``.
+
+        :param source: Signal to split.
+        :param boundaries: Sample indices at which each new beat starts.
+        :return: An EditList with ``len(boundaries) + 1`` beats.
+        """
+        boundaries = np.clip(np.asarray(boundaries, dtype=np.int64), 0, len(source))
+        starts = np.concatenate([[0], boundaries])
+        stops = np.maximum(np.concatenate([boundaries, [len(source)]]), starts)
+        return EditList(source, starts, stops)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> t.Iterator[Segment]:
+        source = self.source
+        for start, stop, step, repeats in zip(
+            self.starts.tolist(), self.stops.tolist(), self.steps.tolist(), self.repeats.tolist()
+        ):
+            yield Segment(source, start, stop, step, repeats)
+
+    def take(self, indices: np.ndarray) -> "EditList":
+        """
+        Selects beats by index, without touching the source.
+
+        :param indices: Indices of the beats to keep, in order, or a boolean mask. Indices may repeat.
+        :return: A new EditList with the selected beats.
+        """
+        return EditList(
+            self.source, self.starts[indices], self.stops[indices], self.steps[indices], self.repeats[indices]
+        )
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        :return: Length of each beat in samples.
+        """
+        return (self.stops - self.starts) * self.repeats
+
+    def render(self) -> np.ndarray:
+        """
+        Copies every beat into a single new array, in order.
+
+        :return: An ndarray with shape (samples, channels).
+        """
+        lengths = self.lengths
+        out = np.empty((int(lengths.sum()),) + self.source.shape[1:], dtype=self.source.dtype)
+
+        position = 0
+        for start, stop, step, repeats in zip(
+            self.starts.tolist(), self.stops.tolist(), self.steps.tolist(), self.repeats.tolist()
+        ):
+            position = _copy_segment(out, position, self.source, start, stop, step, repeats)
+
+        return out
+
+
+def iter_segments(source: np.ndarray, boundaries: t.Iterable[int]) -> t.Iterator[Segment]:
+    """
+    Lazily splits a signal at the given sample indices, yielding the same beats as ``EditList.from_boundaries``.
+
+    :param source: Signal to split.
+    :param boundaries: Sample indices at which each new beat starts. May be a lazy iterator.
+    :return: A generator yielding one Segment per beat.
+    """
+    start = 0
+    for boundary in boundaries:
+        boundary = min(max(int(boundary), 0), len(source))
+        yield Segment(source, start, max(boundary, start))
+        start = boundary
+
+    yield Segment(source, start, len(source))
+
+
+def collect(beats: t.Iterable) -> t.Union[EditList, t.List]:
+    """
+    Collects beats into an EditList if they are all Segments of the same source, or into a list otherwise.
+
+    :param beats: Beats to collect.
+    :return: An EditList or a list containing the given beats.
+    """
+    if isinstance(beats, EditList):
+        return beats
+
+    beats = list(beats)
+    if not beats or not all(isinstance(b, Segment) for b in beats):
+        return beats
+
+    source = beats[0].source
+    if any(b.source is not source for b in beats):
+        return beats
+
+    return EditList(
+        source,
+        [b.start for b in beats],
+        [b.stop for b in beats],
+        [b.step for b in beats],
+        [b.repeats for b in beats],
+    )
+
+
+def trim_beats(beats: t.Iterable, start: int, stop: t.Optional[int]) -> t.Iterator:
+    """
+    Lazily keeps only the samples of a sequence of beats between two positions. Beats that straddle either position
+    are cut, and no more beats are consumed once ``stop`` is reached, so lazy beats are only located as far as needed.
+
+    :param beats: Beats to trim, as Segments or ndarrays.
+    :param start: Position of the first sample to keep.
+    :param stop: Position just past the last sample to keep, or None to keep everything after ``start``.
+    :return: A generator yielding the beats, or parts of beats, that fall between ``start`` and ``stop``.
+    """
+    if stop is not None and stop <= 0:
+        return
+
+    position = 0
+    for beat in beats:
+        length = len(beat)
+        lower = max(start - position, 0)
+        upper = length if stop is None else min(stop - position, length)
+        if (lower, upper) == (0, length):
+            yield beat
+        elif lower < upper:
+            yield beat[lower:upper]
+
+        position += length
+        if stop is not None and position >= stop:
+            return
@@ -4,7 +4,6 @@ from inspect import getdoc
 from typing import Callable, Iterable
 
 import numpy as np
-from jsonschema import validate
 
 Effect = Callable[[Iterable[np.ndarray]], Iterable[np.ndarray]]
 
@@ -22,10 +21,14 @@ class EffectRegistry(type):
 
     ``__effect_schema__`` is an optional schema describing the effect's properties. During validation, this is placed
     within the "properties" field of an object in a Draft 7 JSON schema.
+
+    Compiled validators are cached, and discarded whenever a new effect is registered.
     """
 
     effects = {}
     schemas = {}
+    validators = {}
+    chain_validator = None
 
     def __new__(mcs, name, bases, class_dict):
         cls = type.__new__(mcs, name, bases, class_dict)
@@ -33,6 +36,8 @@ class EffectRegistry(type):
             effect_name = getattr(cls, "__effect_name__", name.lower())
             mcs.effects[effect_name] = cls
             mcs.schemas[effect_name] = getattr(cls, "__effect_schema__", None)
+            EffectRegistry.validators = {}
+            EffectRegistry.chain_validator = None
         return cls
 
     @staticmethod
@@ -88,6 +93,67 @@ class EffectRegistry(type):
 
         return schema
 
+    @staticmethod
+    def get_validator(effect_name: str):
+        """
+        Gets a compiled validator for a single effect.
+
+        :param effect_name: Name of the effect.
+        :return: A Draft 7 validator for the given effect's schema.
+        """
+        validator = EffectRegistry.validators.get(effect_name)
+        if validator is None:
+            # jsonschema is slow to import, and only needed for validation.
+            from jsonschema import Draft7Validator
+
+            validator = Draft7Validator(EffectRegistry.dump_single_effect_schema(effect_name))
+            EffectRegistry.validators[effect_name] = validator
+
+        return validator
+
+    @staticmethod
+    def get_chain_validator():
+        """
+        Gets a compiled validator for an effect chain. Unlike ``dump_list_schema``, each effect is validated against
+        the schema for its type only, so errors point at the parameter that is actually wrong.
+
+        :return: A Draft 7 validator for effect chains.
+        """
+        validator = EffectRegistry.chain_validator
+        if validator is None:
+            from jsonschema import Draft7Validator
+
+            names = list(EffectRegistry.schemas.keys())
+            dispatch = [
+                {
+                    "if": {"properties": {"type": {"const": name}}, "required": ["type"]},
+                    "then": EffectRegistry.dump_single_effect_schema(name),
+                }
+                for name in names
+            ]
+            validator = Draft7Validator(
+                {
+                    "title": "Effect Chain",
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"type": {"enum": names}},
+                        "required": ["type"],
+                        "allOf": dispatch,
+                    },
+                }
+            )
+            EffectRegistry.chain_validator = validator
+
+        return validator
+
+    @staticmethod
+    def _create_effect(effect: dict) -> "LoadableEffect":
+        kwargs = effect.copy()
+        del kwargs["type"]
+
+        return EffectRegistry.effects[effect["type"]](**kwargs)
+
     @staticmethod
     def load_effect(effect: dict) -> "LoadableEffect":
         """
@@ -100,16 +166,27 @@ class EffectRegistry(type):
         :param effect: Effect representation to load.
         :return: An effect based on the given definition.
         """
-        validate(instance=effect, schema=EffectRegistry.dump_schema(root=True))
+        effect_type = effect.get("type") if isinstance(effect, dict) else None
+        if effect_type in EffectRegistry.effects:
+            EffectRegistry.get_validator(effect_type).validate(effect)
+        else:
+            # Reports the unknown type without listing every effect's schema.
+            EffectRegistry.get_chain_validator().validate([effect])
 
-        kwargs = effect.copy()
-        del kwargs["type"]
-
-        return EffectRegistry.effects[effect["type"]](**kwargs)
+        return EffectRegistry._create_effect(effect)
 
     @staticmethod
     def load_effect_chain(effects: Iterable[dict]):
-        return [EffectRegistry.load_effect(e) for e in effects]
+        """
+        Loads a list of effects, validating all of them at once.
+
+        :param effects: Effect representations to load.
+        :return: A list of effects based on the given definitions.
+        """
+        effects = list(effects)
+        EffectRegistry.get_chain_validator().validate(effects)
+
+        return [EffectRegistry._create_effect(e) for e in effects]
 
 
 class EffectABCMeta(EffectRegistry, abc.ABCMeta):
@@ -1,5 +1,8 @@
+from typing import Optional
+
 import numpy as np
 
+from ..edit_list import EditList
 from ..effect_registry import EffectABCMeta
 from .periodic import PeriodicEffect
 
@@ -45,6 +48,41 @@ class CutEveryNth(PeriodicEffect, metaclass=EffectABCMeta):
         offset = self.take_index * size
         return beat[offset : offset + size, ...]
 
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> Optional[EditList]:
+        if np.any(beats.repeats[mask] != 1):
+            # Cutting a repeated beat may need part of several repetitions, which a single segment can't describe.
+            return None
+
+        lengths = beats.lengths
+        size = lengths // self.denominator
+        low = np.minimum(self.take_index * size, lengths)
+        high = np.minimum(low + size, lengths)
+
+        # Reversed beats are cut from the end of their segment, since that's where they start playing.
+        forwards = beats.steps == 1
+        starts = np.where(forwards, beats.starts + low, beats.stops - high)
+        stops = np.where(forwards, beats.starts + high, beats.stops - low)
+        steps = beats.steps
+
+        # Silence is always described from 0, whichever part of it is kept.
+        silent = steps == 0
+        starts = np.where(silent, 0, starts)
+        stops = np.where(silent, high - low, stops)
+
+        # Match Segment slicing, which turns empty slices into forward segments at the start of the beat.
+        empty = high == low
+        starts = np.where(empty, beats.starts, starts)
+        stops = np.where(empty, beats.starts, stops)
+        steps = np.where(empty, 1, steps)
+
+        return EditList(
+            beats.source,
+            np.where(mask, starts, beats.starts),
+            np.where(mask, stops, beats.stops),
+            np.where(mask, steps, beats.steps),
+            beats.repeats,
+        )
+
     def __eq__(self, other):
         return (
             isinstance(other, CutEveryNth)
@@ -1,8 +1,9 @@
 import abc
-from typing import Generator, List, Optional
+from typing import Iterable, List, Optional
 
 import numpy as np
 
+from beatmachine.edit_list import EditList
 from beatmachine.effect_registry import LoadableEffect
 
 
@@ -10,6 +11,9 @@ class PeriodicEffect(LoadableEffect, abc.ABC):
     """
     A PeriodicEffect is an effect that gets applied to beats at a fixed interval, i.e. every other beat. A
     PeriodicEffect with a period of 1 gets applied to every single beat.
+
+    Effects that can be expressed on beat indices alone may also implement ``process_edit_list``. EditLists are then
+    processed all at once with NumPy, rather than one beat at a time.
     """
 
     __effect_schema__ = {
@@ -53,7 +57,35 @@ class PeriodicEffect(LoadableEffect, abc.ABC):
         """
         raise NotImplementedError
 
-    def __call__(self, beats: List[np.ndarray]) -> Generator[np.ndarray, None, None]:
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> Optional[EditList]:
+        """
+        Processes every affected beat of an EditList at once. This must produce the same beats as ``process_beat``.
+
+        :param beats: Beats to process.
+        :param mask: Boolean mask of the beats this effect applies to.
+        :return: Updated beats, or None if this effect can only process beats one at a time.
+        """
+        return None
+
+    def mask(self, count: int) -> np.ndarray:
+        """
+        Determines which beats this effect applies to.
+
+        :param count: Total number of beats.
+        :return: A boolean mask of the affected beats.
+        """
+        indices = np.arange(count) - self.offset
+        return (indices >= 0) & ((indices - 1) % self.period == 0)
+
+    def __call__(self, beats: List[np.ndarray]) -> Iterable[np.ndarray]:
+        if isinstance(beats, EditList):
+            result = self.process_edit_list(beats, self.mask(len(beats)))
+            if result is not None:
+                return result
+
+        return self._process_beats(beats)
+
+    def _process_beats(self, beats: Iterable[np.ndarray]) -> Iterable[np.ndarray]:
         for i, beat in enumerate(beats):
             if i < self.offset:
                 yield beat
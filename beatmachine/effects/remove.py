@@ -2,6 +2,7 @@ from typing import Optional
 
 import numpy as np
 
+from ..edit_list import EditList
 from ..effect_registry import EffectABCMeta
 from .periodic import PeriodicEffect
 
@@ -36,3 +37,6 @@ class RemoveEveryNth(PeriodicEffect, metaclass=EffectABCMeta):
 
     def process_beat(self, beat: np.ndarray) -> Optional[np.ndarray]:
         return None
+
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> EditList:
+        return beats.take(~mask)
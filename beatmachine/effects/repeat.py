@@ -1,5 +1,6 @@
 import numpy as np
 
+from ..edit_list import EditList, Segment
 from ..effect_registry import EffectABCMeta
 from .periodic import PeriodicEffect
 
@@ -28,7 +29,13 @@ class RepeatEveryNth(PeriodicEffect, metaclass=EffectABCMeta):
         self.times = times
 
     def process_beat(self, beat: np.ndarray) -> np.ndarray:
+        if isinstance(beat, Segment):
+            return Segment(beat.source, beat.start, beat.stop, beat.step, beat.repeats * self.times)
         return np.concatenate(self.times * [beat], axis=0)
 
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> EditList:
+        repeats = np.where(mask, beats.repeats * self.times, beats.repeats)
+        return EditList(beats.source, beats.starts, beats.stops, beats.steps, repeats)
+
     def __eq__(self, other):
         return super(RepeatEveryNth, self).__eq__(other) and self.times == other.times
@@ -1,5 +1,6 @@
 import numpy as np
 
+from ..edit_list import EditList
 from ..effect_registry import EffectABCMeta
 from .periodic import PeriodicEffect
 
@@ -12,4 +13,9 @@ class ReverseEveryNth(PeriodicEffect, metaclass=EffectABCMeta):
     __effect_name__ = "reverse"
 
     def process_beat(self, beat: np.ndarray) -> np.ndarray:
-        return np.flip(beat)
+        return beat[::-1]
+
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> EditList:
+        return EditList(
+            beats.source, beats.starts, beats.stops, np.where(mask, -beats.steps, beats.steps), beats.repeats
+        )
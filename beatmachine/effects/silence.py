@@ -1,5 +1,6 @@
 import numpy as np
 
+from ..edit_list import EditList, Segment
 from ..effect_registry import EffectABCMeta
 from .periodic import PeriodicEffect
 
@@ -15,4 +16,15 @@ class SilenceEveryNth(PeriodicEffect, metaclass=EffectABCMeta):
         super().__init__(period=period, offset=offset)
 
     def process_beat(self, beat: np.ndarray) -> np.ndarray:
-        return np.zeros(np.shape(beat), dtype="int16")
+        if isinstance(beat, Segment):
+            return Segment.silence(beat.source, len(beat))
+        return np.zeros_like(beat)
+
+    def process_edit_list(self, beats: EditList, mask: np.ndarray) -> EditList:
+        return EditList(
+            beats.source,
+            np.where(mask, 0, beats.starts),
+            np.where(mask, beats.lengths, beats.stops),
+            np.where(mask, 0, beats.steps),
+            np.where(mask, 1, beats.repeats),
+        )
@@ -0,0 +1,33 @@
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+class Loader(t.Protocol):
+    def load(self, path: t.Union[str, Path], dtype: np.dtype) -> t.Tuple[np.ndarray, int]:
+        """
+        Decodes an audio file.
+
+        :param path: Path to the file to decode.
+        :param dtype: Sample dtype to decode into.
+        :return: A tuple of the signal, with shape (samples, channels), and its sample rate.
+        """
+        raise NotImplementedError()
+
+
+def load_many(
+    loader: Loader, paths: t.Iterable[t.Union[str, Path]], dtype: np.dtype, max_workers: int = None
+) -> t.List[t.Tuple[np.ndarray, int]]:
+    """
+    Decodes several audio files concurrently on a thread pool.
+
+    :param loader: Loader used to decode each file.
+    :param paths: Paths to the files to decode.
+    :param dtype: Sample dtype to decode into.
+    :param max_workers: Maximum number of files decoded at once. Defaults to the thread pool's default.
+    :return: A (signal, sample rate) tuple for each path, in order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda path: loader.load(path, dtype), paths))
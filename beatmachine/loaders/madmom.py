@@ -0,0 +1,15 @@
+import typing as t
+from pathlib import Path
+
+import numpy as np
+from madmom.audio import Signal
+
+
+class MadmomLoader:
+    """
+    Decodes audio with madmom, which runs ffmpeg and collects its entire output before returning.
+    """
+
+    def load(self, path: t.Union[str, Path], dtype: np.dtype) -> t.Tuple[np.ndarray, int]:
+        signal = Signal(str(path), sample_rate=None, num_channels=None, dtype=dtype)
+        return np.asarray(signal).reshape(len(signal), -1), signal.sample_rate
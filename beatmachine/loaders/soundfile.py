@@ -0,0 +1,28 @@
+import typing as t
+from pathlib import Path
+
+import numpy as np
+import soundfile
+
+from ..loader import Loader
+
+
+class SoundfileLoader:
+    """
+    Decodes audio with libsndfile. Files that libsndfile can't read are passed on to a fallback loader, if one is
+    given.
+    """
+
+    def __init__(self, fallback: Loader = None) -> None:
+        super().__init__()
+        self.fallback = fallback
+
+    def load(self, path: t.Union[str, Path], dtype: np.dtype) -> t.Tuple[np.ndarray, int]:
+        try:
+            signal, sample_rate = soundfile.read(path, dtype=np.dtype(dtype).name, always_2d=True)
+        except soundfile.LibsndfileError:
+            if self.fallback is None:
+                raise
+            return self.fallback.load(path, dtype)
+
+        return signal, sample_rate
@@ -0,0 +1,133 @@
+import typing as t
+
+import numpy as np
+
+from .edit_list import Segment, _copy_segment
+
+
+class RenderPlan:
+    """
+    A RenderPlan is a flattened effect chain. It lists the copies needed to produce the final audio: ranges of the
+    source signal written at a given output position (possibly reversed, repeated or silent), plus literal buffers
+    for beats that effects produced as plain ndarrays. Consecutive beats that continue each other in the source, or
+    consecutive silences, are fused into a single copy, so a plan is usually much smaller than the number of beats it
+    renders.
+
+    Use ``Beats.compile`` to create one.
+    """
+
+    source: t.Optional[np.ndarray]
+    positions: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    steps: np.ndarray
+    repeats: np.ndarray
+    literals: t.List[t.Tuple[int, np.ndarray]]
+
+    def __init__(
+        self,
+        source: t.Optional[np.ndarray],
+        positions: np.ndarray,
+        starts: np.ndarray,
+        stops: np.ndarray,
+        steps: np.ndarray,
+        literals: t.List[t.Tuple[int, np.ndarray]],
+        sample_count: int,
+        repeats: np.ndarray = None,
+    ):
+        self.source = source
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+        self.steps = np.asarray(steps, dtype=np.int64)
+        self.repeats = np.ones_like(self.starts) if repeats is None else np.asarray(repeats, dtype=np.int64)
+        self.literals = literals
+        self.sample_count = sample_count
+
+    @staticmethod
+    def compile(beats: t.Iterable) -> "RenderPlan":
+        """
+        Compiles a sequence of beats, typically the lazy output of an effect chain, into a RenderPlan.
+
+        :param beats: Beats to compile, as Segments or ndarrays.
+        :return: A RenderPlan that renders the given beats.
+        """
+        source = None
+        positions, starts, stops, steps, repeats = [], [], [], [], []
+        literals = []
+        position = 0
+        fusable = False
+
+        for beat in beats:
+            if isinstance(beat, Segment) and (source is None or beat.source is source):
+                source = beat.source
+                if fusable and beat.step == steps[-1] and beat.repeats == 1 and repeats[-1] == 1:
+                    if beat.step == 0:
+                        stops[-1] += len(beat)
+                        position += len(beat)
+                        continue
+                    if beat.step == 1 and beat.start == stops[-1]:
+                        stops[-1] = beat.stop
+                        position += len(beat)
+                        continue
+                    if beat.step == -1 and beat.stop == starts[-1]:
+                        starts[-1] = beat.start
+                        position += len(beat)
+                        continue
+
+                positions.append(position)
+                starts.append(beat.start if beat.step else 0)
+                stops.append(beat.stop if beat.step else beat.stop - beat.start)
+                steps.append(beat.step)
+                repeats.append(beat.repeats)
+                fusable = True
+            else:
+                beat = np.asarray(beat)
+                literals.append((position, beat))
+                fusable = False
+
+            position += len(beat)
+
+        return RenderPlan(source, positions, starts, stops, steps, literals, position, repeats)
+
+    def __len__(self) -> int:
+        """
+        :return: Number of copy operations in this plan.
+        """
+        return len(self.starts) + len(self.literals)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: Memory used by this plan, excluding the source signal.
+        """
+        index_bytes = sum(a.nbytes for a in (self.positions, self.starts, self.stops, self.steps, self.repeats))
+        return index_bytes + sum(literal.nbytes for _, literal in self.literals)
+
+    def render(self) -> np.ndarray:
+        """
+        Executes this plan, writing every segment and literal into a single new array.
+
+        :return: An ndarray with shape (samples, channels).
+        """
+        parts = [self.source] if self.source is not None else []
+        parts.extend(literal for _, literal in self.literals)
+        if not parts:
+            raise ValueError("cannot render an empty plan")
+
+        dtype = np.result_type(*parts)
+        out = np.empty((self.sample_count,) + parts[0].shape[1:], dtype=dtype)
+
+        for position, start, stop, step, repeats in zip(
+            self.positions.tolist(),
+            self.starts.tolist(),
+            self.stops.tolist(),
+            self.steps.tolist(),
+            self.repeats.tolist(),
+        ):
+            _copy_segment(out, position, self.source, start, stop, step, repeats)
+
+        for position, literal in self.literals:
+            out[position : position + len(literal)] = literal
+
+        return out
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+import tracemalloc
+import typing as t
+from contextlib import contextmanager
+
+# Hooks are replaced rather than mutated, so stages can read the list without holding the lock.
+_hooks: t.Tuple["Hook", ...] = ()
+_hooks_lock = threading.Lock()
+
+
+class Stage:
+    """
+    A Stage describes one step of the pipeline: decoding a song, locating its beats, applying an effect or saving.
+
+    CPU time covers the whole process, including child processes such as ffmpeg that finished during the stage, so it
+    may exceed wall time. Peak memory is only measured while ``tracemalloc`` is tracing, and is approximate when stages
+    run concurrently.
+    """
+
+    name: str
+    detail: t.Optional[str]
+    wall_time: float
+    cpu_time: float
+    peak_bytes: t.Optional[int]
+    beats_in: t.Optional[int]
+    beats_out: t.Optional[int]
+    bytes_in: t.Optional[int]
+    bytes_out: t.Optional[int]
+
+    def __init__(self, name: str, detail: str = None):
+        """
+        :param name: Kind of stage, one of "load", "detect", "cache", "effect" or "save".
+        :param detail: What the stage worked on, such as the path loaded or the name of the effect applied.
+        """
+        self.name = name
+        self.detail = detail
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_bytes = None
+        self.beats_in = None
+        self.beats_out = None
+        self.bytes_in = None
+        self.bytes_out = None
+
+    def to_json(self) -> dict:
+        return {
+            "name": self.name,
+            "detail": self.detail,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_bytes": self.peak_bytes,
+            "beats_in": self.beats_in,
+            "beats_out": self.beats_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+class Hook(t.Protocol):
+    def __call__(self, stage: Stage) -> None:
+        """
+        Called whenever a stage finishes. May be called from several threads at once.
+
+        :param stage: The finished stage.
+        """
+        raise NotImplementedError
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Registers a function to be called with every stage that finishes, in any thread.
+
+    :param hook: Function to register.
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: Hook) -> None:
+    """
+    Unregisters a function registered with ``add_hook``.
+
+    :param hook: Function to unregister.
+    """
+    global _hooks
+    with _hooks_lock:
+        index = _hooks.index(hook)
+        _hooks = _hooks[:index] + _hooks[index + 1 :]
+
+
+def enabled() -> bool:
+    """
+    :return: Whether any hooks are registered.
+    """
+    return bool(_hooks)
+
+
+def _cpu_time() -> float:
+    # process_time is more precise than os.times, which only counts whole clock ticks, but doesn't cover children.
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+@contextmanager
+def stage(name: str, detail: str = None) -> t.Iterator[Stage]:
+    """
+    Measures a block of code as a stage, and passes it to every hook once the block finishes. The block fills in beat
+    and byte counts on the stage it is given. Stages that raise are not reported.
+
+    :param name: Kind of stage.
+    :param detail: What the stage works on.
+    :return: A context manager yielding the stage.
+    """
+    record = Stage(name, detail)
+    if not _hooks:
+        yield record
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    wall_start, cpu_start = time.perf_counter(), _cpu_time()
+    yield record
+    record.wall_time = time.perf_counter() - wall_start
+    record.cpu_time = _cpu_time() - cpu_start
+
+    if tracing:
+        record.peak_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+    for hook in _hooks:
+        hook(record)
+
+
+class Profile:
+    """
+    A Profile collects every stage that finishes while it is active. Use it as a context manager:
+
+    .. code-block:: python
+
+        with Profile() as profile:
+            Beats.from_song("in.mp3").apply_all(*effects).save("out.mp3")
+        print(profile.to_json())
+    """
+
+    stages: t.List[Stage]
+
+    def __init__(self, trace_memory: bool = True):
+        """
+        :param trace_memory: If set, allocations are traced with ``tracemalloc`` to measure each stage's peak memory.
+                             This makes Python code noticeably slower, but barely affects NumPy.
+        """
+        self.stages = []
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: Stage) -> None:
+        with self._lock:
+            self.stages.append(stage)
+
+    def __enter__(self) -> "Profile":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        remove_hook(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_json(self) -> dict:
+        """
+        :return: Every stage in the order it finished, and the total time spent in each kind of stage.
+        """
+        totals = {}
+        for stage in self.stages:
+            total = totals.setdefault(stage.name, {"count": 0, "wall_time": 0.0, "cpu_time": 0.0})
+            total["count"] += 1
+            total["wall_time"] += stage.wall_time
+            total["cpu_time"] += stage.cpu_time
+
+        return {"stages": [stage.to_json() for stage in self.stages], "totals": totals}
@@ -0,0 +1,286 @@
+import json
+import threading
+import typing as t
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .backend import Backend
+from .cache import BeatCache
+from .loader import Loader
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# Finished jobs are forgotten once there are more than this many of them.
+_MAX_FINISHED_JOBS = 1000
+
+# Host names the server always answers to, besides the interface it is bound to.
+_LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+class _Job:
+    def __init__(self, request: dict):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.status = "queued"
+        self.error = None
+        self.timings = {}
+        self.future = None
+
+    def to_json(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "timings": self.timings,
+            "request": self.request,
+        }
+
+
+class JobServer:
+    """
+    A JobServer runs apply and preprocess jobs in a long-lived process, so models, effect schemas and the beat cache
+    stay loaded between jobs. Jobs are queued and run at most ``concurrency`` at a time.
+
+    Jobs are plain dicts with a "command" of either "apply" or "preprocess", an "input" path and an "output" path.
+    Apply jobs also have "effects", in the same form as for ``BatchJob``, and preprocess jobs may set "reference" to
+    refer to the input song instead of embedding it. Paths are resolved by the server, so they should be absolute.
+
+    ``serve`` exposes the queue over HTTP. It runs whatever jobs it is sent, so only bind it to trusted interfaces. To
+    stop web pages from submitting jobs through the user's browser, it only accepts JSON requests, rejects requests
+    from other origins, and rejects Host headers it doesn't recognise, which defeats DNS rebinding.
+    """
+
+    def __init__(
+        self,
+        backend: Backend = None,
+        dtype: t.Any = np.float64,
+        loader: Loader = None,
+        cache: BeatCache = None,
+        concurrency: int = 2,
+    ):
+        """
+        :param backend: Backend used to locate beats. Defaults to a madmom-based backend.
+        :param dtype: Sample dtype to load songs with, one of float64, float32 or int16.
+        :param loader: Loader used to decode songs. Defaults to libsndfile, falling back to ffmpeg.
+        :param cache: If given, beat locations are looked up in and saved to this cache.
+        :param concurrency: Maximum number of jobs run at once.
+        """
+        self.backend = backend
+        self.dtype = dtype
+        self.loader = loader
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._jobs: t.OrderedDict[str, _Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, request: dict) -> str:
+        """
+        Queues a job.
+
+        :param request: The job to run.
+        :return: The ID of the new job.
+        """
+        command = request.get("command")
+        if command not in ("apply", "preprocess"):
+            raise ValueError(f"unknown command {command!r}, must be 'apply' or 'preprocess'")
+
+        required = ("input", "effects", "output") if command == "apply" else ("input", "output")
+        missing = [key for key in required if key not in request]
+        if missing:
+            raise ValueError(f"{command} jobs need {', '.join(missing)}")
+        if not all(isinstance(request[key], str) for key in ("input", "output")):
+            raise ValueError("input and output must be paths")
+
+        job = _Job(request)
+        with self._lock:
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+
+        return job.id
+
+    def status(self, job_id: str, timeout: float = None) -> dict:
+        """
+        Describes a job, optionally waiting for it to finish first.
+
+        :param job_id: ID returned by ``submit``.
+        :param timeout: If given, how many seconds to wait for the job to finish before describing it.
+        :return: The job's "id", "status" ("queued", "running", "done" or "failed"), "error", "timings" and the
+                 "request" it was submitted with.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+
+        if timeout:
+            wait([job.future], timeout)
+
+        return job.to_json()
+
+    def _run(self, job: _Job):
+        # The client functions below are used by the CLI, so anything only the server needs is imported here.
+        from .batch import BatchJob, PreprocessJob, run_job
+
+        job.status = "running"
+        request = job.request
+        if request["command"] == "apply":
+            batch_job = BatchJob(request["input"], request["effects"], request["output"])
+        else:
+            batch_job = PreprocessJob(request["input"], request["output"], bool(request.get("reference")))
+
+        result = run_job(batch_job, self.backend, self.dtype, self.loader, self.cache)
+        job.timings.update(result.timings)
+        job.error = result.error
+        job.status = "done" if result.ok else "failed"
+
+        self._forget_finished()
+
+    def _forget_finished(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.status in ("done", "failed")]
+            for job_id in finished[: max(len(finished) - _MAX_FINISHED_JOBS, 0)]:
+                del self._jobs[job_id]
+
+    def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        ready: t.Callable[[ThreadingHTTPServer], None] = None,
+        allowed_hosts: t.Iterable[str] = (),
+    ):
+        """
+        Serves the job queue over HTTP until interrupted.
+
+        ``POST /jobs`` queues the job in the request body and returns its ID. ``GET /jobs/<id>`` describes a job, and
+        ``GET /jobs/<id>?wait=<seconds>`` waits for it to finish first. All bodies are JSON.
+
+        :param host: Interface to listen on.
+        :param port: Port to listen on, or 0 to pick a free one.
+        :param ready: Called with the HTTP server once it is listening, e.g. to find its port or shut it down.
+        :param allowed_hosts: Host names clients may use to reach the server, besides localhost and ``host``. Needed
+                              when binding to all interfaces, e.g. to allow the machine's LAN address.
+        """
+        job_server = self
+
+        class Handler(_Handler):
+            server_jobs = job_server
+            server_hosts = frozenset((*_LOCAL_HOSTS, host, *allowed_hosts))
+
+        with ThreadingHTTPServer((host, port), Handler) as http_server:
+            if ready:
+                ready(http_server)
+            http_server.serve_forever()
+
+    def close(self):
+        """
+        Waits for queued jobs to finish, then stops running new ones.
+        """
+        self._executor.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_jobs: JobServer
+    server_hosts: t.FrozenSet[str]
+
+    def _reply(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _forbidden(self) -> t.Optional[str]:
+        host = self.headers.get("Host", "")
+        if urllib.parse.urlsplit(f"//{host}").hostname not in self.server_hosts:
+            return f"unrecognised host {host!r}"
+
+        # Browsers send an Origin header with cross-origin requests, which is all that identifies them.
+        origin = self.headers.get("Origin")
+        if origin is not None and urllib.parse.urlsplit(origin).netloc != host:
+            return f"requests from {origin} are not allowed"
+
+        return None
+
+    def do_POST(self):
+        forbidden = self._forbidden()
+        if forbidden:
+            return self._reply(403, {"error": forbidden})
+
+        # Anything else can be sent cross-origin by a web page without a CORS preflight.
+        if self.headers.get_content_type() != "application/json":
+            return self._reply(415, {"error": "jobs must be sent as application/json"})
+
+        if self.path != "/jobs":
+            return self._reply(404, {"error": f"no such endpoint {self.path}"})
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(request, dict):
+                raise ValueError("job must be a JSON object")
+            job_id = self.server_jobs.submit(request)
+        except ValueError as e:
+            return self._reply(400, {"error": str(e)})
+
+        self._reply(202, {"id": job_id})
+
+    def do_GET(self):
+        forbidden = self._forbidden()
+        if forbidden:
+            return self._reply(403, {"error": forbidden})
+
+        url = urllib.parse.urlsplit(self.path)
+        if not url.path.startswith("/jobs/"):
+            return self._reply(404, {"error": f"no such endpoint {url.path}"})
+
+        try:
+            timeout = float(urllib.parse.parse_qs(url.query).get("wait", [0])[0])
+            self._reply(200, self.server_jobs.status(url.path[len("/jobs/") :], timeout))
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+        except KeyError:
+            self._reply(404, {"error": "no such job"})
+
+    def log_message(self, format, *args):
+        # Clients poll constantly, which would drown out everything else.
+        pass
+
+
+def _request(url: str, data: dict = None) -> dict:
+    body = None if data is None else json.dumps(data).encode()
+    request = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        with e:
+            raise RuntimeError(json.load(e).get("error", str(e))) from None
+
+
+def submit_job(request: dict, url: str = DEFAULT_URL) -> str:
+    """
+    Submits a job to a server started with ``JobServer.serve``.
+
+    :param request: The job to run, as for ``JobServer.submit``.
+    :param url: Base URL of the server.
+    :return: The ID of the new job.
+    """
+    return _request(f"{url}/jobs", request)["id"]
+
+
+def get_job(job_id: str, url: str = DEFAULT_URL, wait: float = None) -> dict:
+    """
+    Describes a job submitted to a server started with ``JobServer.serve``.
+
+    :param job_id: ID returned by ``submit_job``.
+    :param url: Base URL of the server.
+    :param wait: If given, how many seconds to wait for the job to finish before describing it.
+    :return: The job, as for ``JobServer.status``.
+    """
+    query = f"?wait={wait}" if wait else ""
+    return _request(f"{url}/jobs/{job_id}{query}")
@@ -1,8 +1,30 @@
 import itertools
 import typing as t
 
+import numpy as np
+
+# Raw sample formats understood by ffmpeg, by the dtype used to store samples.
+SAMPLE_FORMATS = {
+    np.dtype(np.float64): "f64le",
+    np.dtype(np.float32): "f32le",
+    np.dtype(np.int16): "s16le",
+}
+
 
 def chunks(iterable: t.Iterable[t.T], size: int) -> t.Generator[t.List[t.T], None, None]:
     iterator = iter(iterable)
     for first in iterator:
         yield list(itertools.chain([first], itertools.islice(iterator, size - 1)))
+
+
+def sample_dtype(dtype: t.Any) -> np.dtype:
+    """
+    Validates a sample dtype.
+
+    :param dtype: Anything accepted by ``np.dtype``.
+    :return: The corresponding dtype, if it is one of the keys of ``SAMPLE_FORMATS``.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in SAMPLE_FORMATS:
+        raise ValueError(f"unsupported sample dtype {dtype}, must be one of {[str(d) for d in SAMPLE_FORMATS]}")
+    return dtype
@@ -0,0 +1,3 @@
+"""
+End-to-end benchmarks for beatmachine. Run ``python -m benchmarks --help`` from the repository root for options.
+"""
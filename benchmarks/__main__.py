@@ -0,0 +1,55 @@
+import json
+
+import click
+
+from .suite import run_suite
+
+
+@click.command()
+@click.option("--duration", type=click.FloatRange(1), default=60.0, help="Length of the synthetic song in seconds.")
+@click.option("--sample-rate", type=click.IntRange(8000), default=44100, help="Sample rate of the synthetic song.")
+@click.option("--channels", type=click.IntRange(1), default=2, help="Number of channels in the synthetic song.")
+@click.option("--bpm", type=click.FloatRange(30), default=120.0, help="Tempo of the synthetic song.")
+@click.option(
+    "-d", "--dtype", type=click.Choice(["float64", "float32", "int16"]), default="float64", help="Sample dtype."
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["madmom", "onset", "bpm"]),
+    default="madmom",
+    help="Backend used to locate beats. 'bpm' places beats on the song's known grid. Only 'madmom' needs madmom.",
+)
+@click.option("-r", "--repeat", type=click.IntRange(1), default=3, help="How many times to time each benchmark.")
+@click.option("-k", "--only", help="Only run benchmarks whose names start with this prefix, e.g. 'effect/'.")
+@click.option("-o", "--output", type=click.File("w"), default="-", help="File to write JSON results to.")
+def main(duration, sample_rate, channels, bpm, dtype, backend, repeat, only, output):
+    """
+    Benchmark startup, loading, beat detection, every effect, the example effect chains and saving on a synthetic song.
+
+    Results are written as JSON, so they can be compared between releases. Progress is written to stderr.
+    """
+
+    if backend == "madmom":
+        from beatmachine.backends.madmom import MadmomDbnBackend
+
+        backend = MadmomDbnBackend(model_count=4)
+        backend.warmup()
+    elif backend == "onset":
+        from beatmachine.backends.onset import OnsetDpBackend
+
+        backend = OnsetDpBackend()
+    else:
+        from beatmachine.backends.bpm import BpmBackend
+
+        backend = BpmBackend(bpm, 0)
+
+    def progress(name, result):
+        click.echo(f"{name:40} {result['median'] * 1000:10.2f} ms {result['peak_bytes'] / 2**20:10.2f} MiB", err=True)
+
+    results = run_suite(backend, duration, sample_rate, channels, bpm, dtype, repeat, only, progress)
+    json.dump(results, output, indent=2, sort_keys=True)
+    output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
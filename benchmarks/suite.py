@@ -0,0 +1,168 @@
+import importlib.metadata
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+import numpy as np
+
+import beatmachine
+from beatmachine.beats import Beats, _analysis_signal, _load_audio
+from beatmachine.effect_registry import EffectRegistry
+
+from .song import synthesize_song, write_song
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+# Commands timed in a fresh interpreter, to catch anything that makes startup slow again.
+_STARTUP_COMMANDS = {
+    "import": ["-c", "import beatmachine"],
+    "version": ["-m", "beatmachine", "version"],
+}
+
+
+def measure(fn: t.Callable[[], t.Any], repeat: int = 3) -> dict:
+    """
+    Times a function, then runs it once more to measure its peak memory use. Memory is measured separately, since
+    tracing allocations slows everything down.
+
+    :param fn: Function to measure.
+    :param repeat: How many times to time it.
+    :return: A dict with the time of each run, the fastest and median times, and the peak number of bytes allocated.
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "min": min(seconds), "median": statistics.median(seconds), "peak_bytes": peak_bytes}
+
+
+def _load_effect_with_defaults(effect_name: str):
+    schema = EffectRegistry.schemas[effect_name] or {}
+    defaults = {key: value["default"] for key, value in schema.items() if "default" in value}
+    return EffectRegistry.load_effect({"type": effect_name, **defaults})
+
+
+def _seeded(fn: t.Callable[[], t.Any]) -> t.Callable[[], t.Any]:
+    # Randomized effects should do the same work every run.
+    def run():
+        random.seed(0)
+        return fn()
+
+    return run
+
+
+def _benchmarks(
+    directory: Path, backend, duration: float, sample_rate: int, channels: int, bpm: float, dtype: np.dtype
+) -> t.Iterator[t.Tuple[str, t.Callable[[], t.Any]]]:
+    # Peak memory is measured in this process, so only the times of startup benchmarks mean anything.
+    package_root = Path(beatmachine.__file__).parent.parent
+    for name, args in _STARTUP_COMMANDS.items():
+        command = [sys.executable, *args]
+        yield f"startup/{name}", lambda command=command: subprocess.run(
+            command, cwd=package_root, check=True, stdout=subprocess.DEVNULL
+        )
+
+    signal = synthesize_song(duration, sample_rate, channels, bpm)
+    song_path = directory / "song.wav"
+    write_song(song_path, signal, sample_rate)
+
+    yield "load", lambda: _load_audio(song_path, dtype)
+
+    signal, sample_rate = _load_audio(song_path, dtype)
+    analysis, analysis_sample_rate = _analysis_signal(backend, signal, sample_rate)
+    yield "detect", lambda: backend.locate_beats(analysis, analysis_sample_rate)
+
+    beats = Beats.from_signal(signal, sample_rate, backend)
+
+    for effect_name in sorted(EffectRegistry.effects):
+        effect = _load_effect_with_defaults(effect_name)
+        yield f"effect/{effect_name}", _seeded(lambda effect=effect: beats.apply(effect))
+
+    for example in sorted(EXAMPLES_DIR.glob("*.json")):
+        with example.open() as fp:
+            chain = EffectRegistry.load_effect_chain(json.load(fp))
+        yield f"apply/{example.stem}", _seeded(lambda chain=chain: beats.apply_all(*chain))
+
+    for out_format in ("wav", "mp3"):
+        output = str(directory / f"out.{out_format}")
+        yield f"save/{out_format}", lambda output=output: beats.save(output)
+
+
+def run_suite(
+    backend,
+    duration: float = 60.0,
+    sample_rate: int = 44100,
+    channels: int = 2,
+    bpm: float = 120.0,
+    dtype: t.Any = np.float64,
+    repeat: int = 3,
+    only: t.Optional[str] = None,
+    progress: t.Callable[[str, dict], None] = None,
+) -> dict:
+    """
+    Runs every benchmark against a synthesized song.
+
+    :param backend: Backend used to locate beats. Warm it up first, so loading models isn't counted.
+    :param duration: Length of the song in seconds.
+    :param sample_rate: Sample rate of the song.
+    :param channels: Number of channels in the song.
+    :param bpm: Tempo of the song.
+    :param dtype: Sample dtype to load the song with.
+    :param repeat: How many times to time each benchmark.
+    :param only: If given, only benchmarks whose names start with this prefix are run.
+    :param progress: Called with the name and result of each benchmark as it finishes.
+    :return: A JSON-serializable dict describing the environment, configuration and results.
+    """
+    dtype = np.dtype(dtype)
+    config = {
+        "backend": f"{type(backend).__module__}.{type(backend).__qualname__}",
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "bpm": bpm,
+        "dtype": str(dtype),
+        "repeat": repeat,
+    }
+
+    try:
+        version = importlib.metadata.version("beatmachine")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="beatmachine-benchmark-") as directory:
+        for name, fn in _benchmarks(Path(directory), backend, duration, sample_rate, channels, bpm, dtype):
+            if only and not name.startswith(only):
+                continue
+
+            results[name] = measure(fn, repeat)
+            if progress:
+                progress(name, results[name])
+
+    return {
+        "environment": {
+            "beatmachine": version,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "config": config,
+        "results": results,
+    }
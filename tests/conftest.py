@@ -3,6 +3,10 @@ from pathlib import Path
 import numpy as np
 import pytest
 
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.edit_list import EditList
+
 RESOURCES_DIR = Path(__file__).parent / "resources"
 
 
@@ -19,3 +23,32 @@ def drums_wav_path():
 @pytest.fixture
 def song_ascending():
     return [np.full(4, 1), np.full(4, 2), np.full(4, 3), np.full(4, 4)]
+
+
+@pytest.fixture
+def beats():
+    # One second of two sine tones, split into 16 beats.
+    t = np.linspace(0, 1, 8000, endpoint=False)
+    signal = np.stack([np.sin(2 * np.pi * 220 * t), np.sin(2 * np.pi * 330 * t)], axis=1) / 2
+    return Beats(8000, 2, EditList.from_boundaries(signal, np.arange(500, 8000, 500)))
+
+
+class _CountingBackend(BpmBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Private, so backend_params doesn't mistake the count for a parameter and change the cache key.
+        self._calls = 0
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def locate_beats(self, signal, sample_rate):
+        self._calls += 1
+        return super().locate_beats(signal, sample_rate)
+
+
+@pytest.fixture
+def counting_backend():
+    # Creates BpmBackends that count how many times they've located beats.
+    return _CountingBackend
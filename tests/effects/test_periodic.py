@@ -3,8 +3,12 @@ from typing import Optional
 import numpy as np
 import pytest
 
+import beatmachine.effects as fx
+from beatmachine.edit_list import EditList
 from beatmachine.effects.periodic import PeriodicEffect
 
+from .effect_test_util import assert_beat_sequences_equal
+
 
 class _NoOpEffect(PeriodicEffect):
     __effect_name__: str = "nothing"
@@ -21,3 +25,42 @@ def test_zero_period_disallowed():
 def test_negative_period_disallowed():
     with pytest.raises(ValueError):
         _ = _NoOpEffect(period=-1)
+
+
+@pytest.fixture
+def edit_list():
+    # Uneven beats, some of them already reversed and one empty.
+    signal = np.arange(300).reshape(-1, 1)
+    beats = EditList.from_boundaries(signal, [10, 17, 17, 60, 61, 150, 200, 230, 299])
+    return EditList(signal, beats.starts, beats.stops, np.resize([1, -1, 1], len(beats)))
+
+
+@pytest.mark.parametrize(
+    "effect",
+    [
+        fx.RemoveEveryNth(period=2),
+        fx.RemoveEveryNth(period=3, offset=2),
+        fx.ReverseEveryNth(),
+        fx.ReverseEveryNth(period=2, offset=1),
+        fx.CutEveryNth(),
+        fx.CutEveryNth(period=2, denominator=3, take_index=2, offset=1),
+        fx.CutEveryNth(denominator=4, take_index=5),
+        fx.SilenceEveryNth(period=2),
+        fx.RepeatEveryNth(period=3, times=3),
+    ],
+)
+def test_vectorised_effects_match_per_beat(edit_list, effect):
+    vectorised = effect(edit_list)
+    assert isinstance(vectorised, EditList)
+
+    assert_beat_sequences_equal(list(effect._process_beats(edit_list)), list(vectorised))
+
+
+def test_vectorised_chains_match_per_beat(edit_list):
+    chain = [fx.RepeatEveryNth(period=2), fx.SilenceEveryNth(period=3), fx.ReverseEveryNth(), fx.CutEveryNth()]
+
+    vectorised, per_beat = edit_list, iter(edit_list)
+    for effect in chain:
+        vectorised, per_beat = effect(vectorised), effect._process_beats(per_beat)
+
+    assert_beat_sequences_equal(list(per_beat), list(vectorised))
@@ -6,8 +6,15 @@ from .effect_test_util import *
 
 
 def test_reverse_every_nth():
-    forward_beat = np.ndarray([1, 2, 3, 4])
+    forward_beat = np.array([1, 2, 3, 4])
     reversed_beat = np.flip(forward_beat)
     reverse_effect = ReverseEveryNth(period=2)
 
     assert_beat_sequences_equal([forward_beat, reversed_beat] * 2, list(reverse_effect([forward_beat] * 4)))
+
+
+def test_reverse_keeps_channels():
+    forward_beat = np.array([[1, -1], [2, -2], [3, -3]])
+    reverse_effect = ReverseEveryNth(period=1)
+
+    assert_beat_sequences_equal([[[3, -3], [2, -2], [1, -1]]], list(reverse_effect([forward_beat])))
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 from beatmachine.effects.silence import SilenceEveryNth
 
 from .effect_test_util import *
@@ -6,3 +9,10 @@ from .effect_test_util import *
 def test_silence_every_nth(song_ascending):
     silence_effect = SilenceEveryNth(period=2)
     assert_beat_sequences_equal([[1] * 4, [0] * 4, [3] * 4, [0] * 4], list(silence_effect(song_ascending)))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int16])
+def test_silence_keeps_dtype(dtype):
+    silence_effect = SilenceEveryNth(period=1)
+    (silenced,) = silence_effect([np.ones((4, 2), dtype=dtype)])
+    assert silenced.dtype == dtype
@@ -0,0 +1,85 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import soundfile
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+
+
+def test_from_song_async_matches_from_song(drums_wav_path):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        beats = asyncio.run(Beats.from_song_async(drums_wav_path, BpmBackend(120, 0), executor=executor))
+
+    np.testing.assert_array_equal(Beats.from_song(drums_wav_path, BpmBackend(120, 0)).to_ndarray(), beats.to_ndarray())
+
+
+def test_save_async_to_file(beats, tmp_path):
+    beats = beats.apply_all(fx.SilenceEveryNth(period=2), fx.RepeatEveryNth(period=3))
+
+    assert asyncio.run(beats.save_async(str(tmp_path / "out.wav"))) is None
+
+    data, sample_rate = soundfile.read(tmp_path / "out.wav")
+    assert sample_rate == 8000
+    np.testing.assert_allclose(beats.to_ndarray(), data, atol=1e-3)
+
+
+def test_save_async_awaits_async_writers(beats):
+    class AsyncWriter:
+        def __init__(self):
+            self.buffer = io.BytesIO()
+
+        async def write(self, data):
+            await asyncio.sleep(0)
+            self.buffer.write(data)
+
+    writer = AsyncWriter()
+    written = asyncio.run(beats.save_async(writer, out_format="wav"))
+
+    assert written == len(writer.buffer.getvalue())
+    data, _ = soundfile.read(io.BytesIO(writer.buffer.getvalue()))
+    np.testing.assert_allclose(beats.to_ndarray(), data, atol=1e-3)
+
+
+def test_concurrent_saves_overlap(beats):
+    async def save_all():
+        buffers = [io.BytesIO() for _ in range(4)]
+        await asyncio.gather(*(beats.save_async(buffer, out_format="wav") for buffer in buffers))
+        return [buffer.getvalue() for buffer in buffers]
+
+    outputs = asyncio.run(save_all())
+    assert len(set(outputs)) == 1 and outputs[0]
+
+
+def test_cancelling_save_async_stops_ffmpeg(beats, monkeypatch):
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def recording_create_subprocess_exec(*args, **kwargs):
+        processes.append(await create_subprocess_exec(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_create_subprocess_exec)
+
+    class StuckWriter:
+        async def write(self, data):
+            await asyncio.Event().wait()
+
+    async def cancel_save():
+        task = asyncio.ensure_future(beats.save_async(StuckWriter(), out_format="wav"))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(cancel_save(), 5))
+    assert processes[0].returncode is not None
+
+
+def test_save_async_requires_format_for_file_objects(beats):
+    with pytest.raises(ValueError):
+        asyncio.run(beats.save_async(io.BytesIO()))
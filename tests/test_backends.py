@@ -0,0 +1,219 @@
+import io
+import pickle
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import beatmachine.backends.madmom as madmom_backend
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.backends.madmom import MadmomDbnBackend
+from beatmachine.backends.onset import OnsetDpBackend
+from beatmachine.beats import _resample
+from beatmachine.loaders.soundfile import SoundfileLoader
+
+
+class _CountingProcessor:
+    created = 0
+
+    def __init__(self, **kwargs):
+        type(self).created += 1
+
+
+def test_madmom_processors_are_loaded_once(monkeypatch):
+    class RNN(_CountingProcessor):
+        pass
+
+    monkeypatch.setattr(madmom_backend, "RNNBeatProcessor", RNN)
+    backend = MadmomDbnBackend()
+
+    threads = [threading.Thread(target=backend.warmup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    backend.warmup()
+
+    assert RNN.created == 1
+
+
+def test_madmom_backend_pickles_without_processors(monkeypatch):
+    monkeypatch.setattr(madmom_backend, "RNNBeatProcessor", _CountingProcessor)
+    backend = MadmomDbnBackend(min_bpm=90)
+    backend.warmup()
+
+    restored = pickle.loads(pickle.dumps(backend))
+
+    assert restored.min_bpm == 90
+    assert restored._processors is None
+    restored.warmup()
+
+
+def test_parallel_models_match_sequential(drums_wav_path):
+    signal, sample_rate = SoundfileLoader().load(drums_wav_path, np.float64)
+
+    expected = MadmomDbnBackend(model_count=2).locate_beats(signal, sample_rate)
+
+    backend = MadmomDbnBackend(model_count=2, workers=2)
+    try:
+        actual = backend.locate_beats(signal, sample_rate)
+    finally:
+        backend.close()
+
+    np.testing.assert_array_equal(expected, actual)
+
+
+def test_zero_workers_disallowed():
+    with pytest.raises(ValueError):
+        _ = MadmomDbnBackend(workers=0)
+
+
+@pytest.fixture
+def click_track():
+    # 10 seconds at 1 kHz with a click every 0.47 seconds.
+    signal = np.zeros((10000, 1))
+    signal[::470] = 1
+    return signal
+
+
+@pytest.fixture
+def click_backend(monkeypatch):
+    backend = MadmomDbnBackend()
+    backend.analysis_sample_rate = None
+    backend.analysis_channels = None
+    monkeypatch.setattr(backend, "_get_processors", lambda: (None, lambda act: np.flatnonzero(act > 0.5) / 100))
+    monkeypatch.setattr(backend, "_activations", lambda signal, sample_rate: signal[::10, 0])
+    return backend
+
+
+@pytest.mark.parametrize("chunk_seconds,overlap_seconds", [(60, 10), (3, 1), (2.5, 0.75), (1, 0)])
+def test_iter_beats_matches_locate_beats(click_track, click_backend, chunk_seconds, overlap_seconds):
+    expected = click_backend.locate_beats(click_track, 1000)
+    actual = list(click_backend.iter_beats(click_track, 1000, chunk_seconds, overlap_seconds))
+
+    # Positions are truncated to whole samples, which can differ by one depending on the window offset.
+    np.testing.assert_allclose(expected, actual, atol=1)
+
+
+def test_iter_beats_is_incremental(click_track, click_backend):
+    beats = click_backend.iter_beats(click_track, 1000, chunk_seconds=2, overlap_seconds=0.5)
+    assert next(beats) == 0
+
+
+def test_streaming_beats_match_located_beats(click_track, click_backend):
+    effects = [fx.SwapBeats(), fx.ReverseEveryNth(period=3), fx.RepeatEveryNth(period=5)]
+
+    expected = Beats.from_signal(click_track, 1000, click_backend).apply_all(*effects)
+    streamed = Beats.from_signal(click_track, 1000, click_backend, streaming=True).apply_all(*effects)
+
+    np.testing.assert_array_equal(expected.to_ndarray(), streamed.to_ndarray())
+
+
+def test_overlap_must_be_less_than_half_of_chunk(click_track, click_backend):
+    with pytest.raises(ValueError):
+        _ = list(click_backend.iter_beats(click_track, 1000, chunk_seconds=2, overlap_seconds=1))
+
+
+class _RecordingBackend:
+    analysis_sample_rate = 1000
+    analysis_channels = 1
+
+    def locate_beats(self, signal, sample_rate):
+        self.received = (signal, sample_rate)
+        return np.array([250, 500, 750])
+
+
+def test_backend_receives_analysis_signal():
+    t = np.arange(4000) / 4000
+    signal = np.stack([np.sin(2 * np.pi * 5 * t), np.sin(2 * np.pi * 5 * t)], axis=1)
+    backend = _RecordingBackend()
+
+    beats = Beats.from_signal(signal, 4000, backend)
+
+    analysis, sample_rate = backend.received
+    assert sample_rate == 1000 and analysis.shape == (1000,)
+    np.testing.assert_allclose(signal[::4, 0], analysis, atol=1e-2)
+
+    assert beats.sample_rate == 4000 and beats.channels == 2
+    np.testing.assert_array_equal([0, 1000, 2000, 3000], beats._beats.starts)
+    np.testing.assert_array_equal(signal, beats.to_ndarray())
+
+
+def test_bpm_backend_offsets_first_beat():
+    beats = BpmBackend(120, 250).locate_beats(np.zeros((4000, 1)), 1000)
+    np.testing.assert_array_equal([250, 750, 1250, 1750, 2250, 2750, 3250, 3750], beats)
+
+
+@pytest.fixture
+def drum_loop():
+    # 20 seconds at 22.05 kHz and 100 BPM: a low thump on every beat and a quieter noise burst halfway between beats.
+    sample_rate, period = 22050, 0.6
+    time = np.arange(20 * sample_rate) / sample_rate
+    since_beat = (time - 0.3) % period
+    since_offbeat = (time - 0.3 + period / 2) % period
+    noise = np.random.default_rng(0).standard_normal(len(time))
+    signal = np.sin(2 * np.pi * 60 * since_beat) * np.exp(-40 * since_beat) + 0.2 * noise * np.exp(-100 * since_offbeat)
+    return signal.reshape(-1, 1), sample_rate
+
+
+@pytest.mark.parametrize("sample_rate_factor", [1, 2])
+def test_onset_backend_finds_steady_beats(drum_loop, sample_rate_factor):
+    signal, sample_rate = drum_loop
+    signal, sample_rate = np.repeat(signal, sample_rate_factor, axis=0), sample_rate * sample_rate_factor
+
+    beats = OnsetDpBackend().locate_beats(signal[:, 0], sample_rate) / sample_rate
+
+    assert 30 <= len(beats) <= 33
+    np.testing.assert_allclose(np.diff(beats), 0.6, atol=0.02)
+    # Onsets are found slightly early, since each analysis frame is centred on its position.
+    np.testing.assert_allclose((beats - 0.3) % 0.6, 0.6, atol=0.03)
+
+
+def test_onset_backend_handles_silence():
+    assert len(OnsetDpBackend().locate_beats(np.zeros(44100), 44100)) == 0
+    assert len(OnsetDpBackend().locate_beats(np.zeros(100), 44100)) == 0
+
+
+@pytest.mark.parametrize("dtype,scale", [(np.int16, np.iinfo(np.int16).max), (np.float32, 1)])
+def test_streaming_beats_keep_signal_dtype(click_track, click_backend, dtype, scale):
+    signal = (click_track * 0.5 * scale).astype(dtype)
+
+    expected = Beats.from_signal(signal, 1000, click_backend)
+    streamed = Beats.from_signal(signal, 1000, click_backend, streaming=True)
+    assert streamed.dtype == dtype
+
+    expected_fp, streamed_fp = io.BytesIO(), io.BytesIO()
+    expected.save(expected_fp, out_format="wav")
+    streamed.save(streamed_fp, out_format="wav")
+    assert expected_fp.getvalue() == streamed_fp.getvalue()
+
+
+def test_analysis_signal_resamples_without_scipy():
+    t = np.arange(48000) / 48000
+    signal = np.sin(2 * np.pi * 3 * t).reshape(-1, 1)
+    backend = _RecordingBackend()
+    backend.analysis_sample_rate = 44100
+
+    Beats.from_signal(signal, 48000, backend)
+
+    analysis, sample_rate = backend.received
+    assert sample_rate == 44100 and analysis.shape == (44100,)
+    np.testing.assert_allclose(np.sin(2 * np.pi * 3 * np.arange(44100) / 44100), analysis, atol=1e-3)
+
+
+def test_resampling_memory_is_bounded():
+    # Two minutes at 48 kHz, long enough that resampling it all at once would need far more than the bound below.
+    signal = np.random.default_rng(0).standard_normal(48000 * 120).astype(np.float32)
+
+    tracemalloc.start()
+    try:
+        resampled = _resample(signal, 48000, 44100)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(resampled) == 44100 * 120
+    assert peak - resampled.nbytes < 8 << 20
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.batch import BatchJob, PreprocessJob, read_manifest, run_batch
+
+
+def test_read_manifest_resolves_paths(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        json.dumps({"input": "a.wav", "effects": [{"type": "reverse"}], "output": "/out/a.wav"})
+        + "\n\n"
+        + json.dumps({"input": "b.wav", "effects": "chain.json", "output": "b.mp3"})
+        + "\n"
+    )
+
+    first, second = read_manifest(manifest)
+
+    assert (first.input, first.effects, str(first.output)) == (tmp_path / "a.wav", [{"type": "reverse"}], "/out/a.wav")
+    assert (second.effects, second.output) == (str(tmp_path / "chain.json"), tmp_path / "b.mp3")
+
+
+@pytest.mark.parametrize("line", ["not json", json.dumps({"input": "a.wav", "output": "b.wav"})])
+def test_read_manifest_rejects_invalid_lines(tmp_path, line):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(line + "\n")
+
+    with pytest.raises(ValueError, match=":1:"):
+        read_manifest(manifest)
+
+
+def test_failed_jobs_dont_stop_the_batch(tmp_path, drums_wav_path, counting_backend):
+    backend = counting_backend(120, 0)
+    jobs = [
+        BatchJob(drums_wav_path, [{"type": "reverse"}], tmp_path / "reversed.wav"),
+        BatchJob(drums_wav_path, {"type": "silence"}, tmp_path / "silenced.wav"),
+        BatchJob(drums_wav_path, [{"type": "nonexistent"}], tmp_path / "invalid.wav"),
+        BatchJob(tmp_path / "missing.wav", [{"type": "reverse"}], tmp_path / "missing-out.wav"),
+    ]
+
+    results = sorted(run_batch(jobs, backend, max_workers=2), key=lambda r: r.index)
+
+    assert [r.ok for r in results] == [True, True, False, False]
+    assert (tmp_path / "reversed.wav").is_file() and (tmp_path / "silenced.wav").is_file()
+    assert set(results[0].timings) == {"load", "render"}
+    assert backend.calls == 1
+
+
+def test_existing_outputs_are_kept_unless_overwriting(tmp_path, drums_wav_path):
+    output = tmp_path / "out.wav"
+    output.write_bytes(b"keep")
+
+    (result,) = run_batch([BatchJob(drums_wav_path, [], output)], BpmBackend(120, 0), overwrite=False)
+
+    assert not result.ok and "FileExistsError" in result.error
+    assert output.read_bytes() == b"keep"
+
+
+def test_failed_encodes_are_reported(tmp_path, drums_wav_path):
+    output = tmp_path / "missing" / "out.wav"
+
+    (result,) = run_batch([BatchJob(drums_wav_path, [{"type": "reverse"}], output)], BpmBackend(120, 0))
+
+    assert not result.ok and "CalledProcessError" in result.error
+    # ffmpeg's own explanation is kept.
+    assert "ffmpeg exited with status" in result.error
+    assert not output.exists()
+
+
+def test_preprocess_jobs_write_beat_files(tmp_path, drums_wav_path):
+    jobs = [PreprocessJob(drums_wav_path, tmp_path / "drums.beat"), PreprocessJob(tmp_path / "drums.beat", "x.beat")]
+
+    first, second = sorted(run_batch(jobs, BpmBackend(120, 0)), key=lambda result: result.index)
+
+    assert first.ok and set(first.timings) == {"load", "write"}
+    assert len(Beats.from_beat_file(tmp_path / "drums.beat").to_ndarray()) > 0
+    assert not second.ok and "already been preprocessed" in second.error
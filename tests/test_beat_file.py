@@ -0,0 +1,175 @@
+import json
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.__main__ import cli
+from beatmachine.beat_file import _PREAMBLE, _align, write_beat_file
+from beatmachine.edit_list import EditList
+from beatmachine.loaders.soundfile import SoundfileLoader
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    rng = np.random.default_rng(0)
+    beats = Beats.from_beat_locations(rng.uniform(-1, 1, size=(400, 2)).astype(np.float32), 100, [50, 120, 300])
+    beats.to_beat_file(tmp_path / "song.beat")
+    loaded = Beats.from_beat_file(tmp_path / "song.beat")
+
+    assert isinstance(loaded._beats.source, np.memmap)
+    assert (loaded.sample_rate, loaded.channels, loaded.dtype) == (100, 2, np.float32)
+    np.testing.assert_array_equal(beats._beats.starts, loaded._beats.starts)
+
+    effects = [fx.ReverseEveryNth(period=2), fx.SilenceEveryNth(period=3)]
+    np.testing.assert_array_equal(beats.apply_all(*effects).to_ndarray(), loaded.apply_all(*effects).to_ndarray())
+
+
+def test_modified_beats_round_trip(beats, tmp_path):
+    beats = beats.apply_all(fx.SilenceEveryNth(period=2), fx.RepeatEveryNth(period=3))
+    beats.to_beat_file(tmp_path / "song.beat")
+
+    np.testing.assert_array_equal(beats.to_ndarray(), Beats.from_beat_file(tmp_path / "song.beat").to_ndarray())
+
+    # Cutting repeated beats produces plain arrays, which can't refer to the source.
+    beats = beats.apply(fx.CutEveryNth(denominator=3, take_index=1))
+    beats.to_beat_file(tmp_path / "song.beat")
+
+    np.testing.assert_array_equal(beats.to_ndarray(), Beats.from_beat_file(tmp_path / "song.beat").to_ndarray())
+
+    with pytest.raises(ValueError):
+        beats.to_beat_file(tmp_path / "song.beat", source=tmp_path / "song.wav")
+
+
+def test_source_is_referenced(tmp_path, drums_wav_path):
+    shutil.copy(drums_wav_path, tmp_path / "drums.wav")
+    signal, sample_rate = SoundfileLoader().load(tmp_path / "drums.wav", np.float64)
+    beats = Beats.from_beat_locations(signal, sample_rate, [1000, 5000])
+    beats.to_beat_file(tmp_path / "drums.beat", source=tmp_path / "drums.wav")
+
+    assert (tmp_path / "drums.beat").stat().st_size < 4096
+    np.testing.assert_array_equal(beats.to_ndarray(), Beats.from_beat_file(tmp_path / "drums.beat").to_ndarray())
+
+
+@pytest.mark.parametrize("contents", [b"", b"BEATMACH", pickle.dumps([np.zeros(4)])])
+def test_invalid_files_are_rejected(tmp_path, contents):
+    (tmp_path / "song.beat").write_bytes(contents)
+
+    with pytest.raises(ValueError):
+        Beats.from_beat_file(tmp_path / "song.beat")
+
+
+def _rewrite_index(path, index):
+    contents = bytearray(path.read_bytes())
+    _, _, size = _PREAMBLE.unpack_from(contents)
+    offset = _align(_PREAMBLE.size + size)
+    data = np.asarray(index, dtype="<i8").tobytes()
+    contents[offset : offset + len(data)] = data
+    path.write_bytes(contents)
+
+
+@pytest.mark.parametrize(
+    "starts, stops, steps, repeats",
+    [
+        ([0, 200], [200, 500], [1, 1], [1, 1]),
+        ([-100, 200], [200, 400], [1, 1], [1, 1]),
+        ([0, 300], [200, 100], [1, -1], [1, 1]),
+        ([0, 200], [200, 400], [1, 2], [1, 1]),
+        ([0, 200], [200, 400], [1, 1], [1, 0]),
+        ([0, 200], [200, 400], [1, 1], [1, 1 << 50]),
+        ([0, 0], [200, 1 << 50], [1, 0], [1, 1]),
+    ],
+)
+def test_malformed_indexes_are_rejected(tmp_path, starts, stops, steps, repeats):
+    signal = np.zeros((400, 2), dtype=np.float32)
+    write_beat_file(tmp_path / "song.beat", 100, EditList.from_boundaries(signal, [200]))
+    _rewrite_index(tmp_path / "song.beat", [starts, stops, steps, repeats])
+
+    with pytest.raises(ValueError):
+        Beats.from_beat_file(tmp_path / "song.beat")
+
+
+def test_silenced_repeats_round_trip(tmp_path):
+    # Silencing a repeated beat folds its repeats into its length, which here is longer than the whole signal.
+    beats = Beats.from_beat_locations(np.ones((400, 2)), 100, [100])
+    beats = beats.apply_all(fx.RepeatEveryNth(period=1, times=3), fx.SilenceEveryNth(period=2))
+    beats.to_beat_file(tmp_path / "song.beat")
+
+    np.testing.assert_array_equal(beats.to_ndarray(), Beats.from_beat_file(tmp_path / "song.beat").to_ndarray())
+
+
+def test_overly_long_beats_cant_be_written(tmp_path):
+    signal = np.zeros((400, 2), dtype=np.float32)
+    beats = EditList(signal, [0, 200], [200, 400], [1, 1], [1, 1 << 40])
+
+    with pytest.raises(ValueError, match="seconds of audio"):
+        write_beat_file(tmp_path / "song.beat", 100, beats)
+
+
+def _rewrite_header(path, replace=None, **fields):
+    # The index and signal are aligned relative to each other, so they can be moved to follow a new header.
+    contents = path.read_bytes()
+    magic, version, size = _PREAMBLE.unpack_from(contents)
+    header = {**json.loads(contents[_PREAMBLE.size : _PREAMBLE.size + size]), **fields} if replace is None else replace
+    header = json.dumps(header).encode()
+    preamble = _PREAMBLE.pack(magic, version, len(header)) + header
+    rest = contents[_align(_PREAMBLE.size + size) :]
+    path.write_bytes(preamble + bytes(_align(len(preamble)) - len(preamble)) + rest)
+
+
+@pytest.mark.parametrize("header", [{}, [], {"beats": "x"}])
+def test_malformed_headers_are_rejected(beats, tmp_path, header):
+    beats.to_beat_file(tmp_path / "song.beat")
+    _rewrite_header(tmp_path / "song.beat", replace=header)
+
+    with pytest.raises(ValueError, match="header"):
+        Beats.from_beat_file(tmp_path / "song.beat")
+
+
+@pytest.mark.parametrize("fields", [{"beats": -1}, {"frames": True}, {"sample_rate": 0}, {"source": 1}])
+def test_invalid_header_fields_are_rejected(beats, tmp_path, fields):
+    beats.to_beat_file(tmp_path / "song.beat")
+    _rewrite_header(tmp_path / "song.beat", **fields)
+
+    with pytest.raises(ValueError, match="header"):
+        Beats.from_beat_file(tmp_path / "song.beat")
+
+
+def test_unsupported_sample_formats_are_rejected(beats, tmp_path):
+    beats.to_beat_file(tmp_path / "song.beat")
+    _rewrite_header(tmp_path / "song.beat", dtype="<u4")
+
+    with pytest.raises(ValueError, match="sample format"):
+        Beats.from_beat_file(tmp_path / "song.beat")
+
+
+@pytest.mark.parametrize("source", ["../song.wav", "/etc/passwd", "sub/../../song.wav"])
+def test_sources_outside_the_directory_are_rejected(beats, tmp_path, source):
+    (tmp_path / "beats").mkdir()
+    beats.to_beat_file(tmp_path / "beats" / "song.beat")
+    _rewrite_header(tmp_path / "beats" / "song.beat", source=source)
+
+    with pytest.raises(ValueError, match="outside"):
+        Beats.from_beat_file(tmp_path / "beats" / "song.beat")
+
+
+def test_sources_outside_the_directory_cant_be_written(beats, tmp_path):
+    (tmp_path / "beats").mkdir()
+
+    with pytest.raises(ValueError, match="outside"):
+        beats.to_beat_file(tmp_path / "beats" / "song.beat", source=tmp_path / "song.wav")
+
+
+@pytest.mark.parametrize("output", ["missing/drums.beat", "beats/drums.beat"])
+def test_preprocess_checks_output_before_locating_beats(tmp_path, drums_wav_path, output):
+    (tmp_path / "songs" / "beats").mkdir(parents=True)
+    shutil.copy(drums_wav_path, tmp_path / "songs" / "drums.wav")
+
+    result = CliRunner().invoke(
+        cli, ["preprocess", "-r", str(tmp_path / "songs" / "drums.wav"), "-o", str(tmp_path / "songs" / output)]
+    )
+
+    assert result.exit_code == 2 and "Processing" not in result.output
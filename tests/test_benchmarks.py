@@ -0,0 +1,30 @@
+import json
+
+import numpy as np
+
+from beatmachine.backends.bpm import BpmBackend
+from benchmarks.song import synthesize_song
+from benchmarks.suite import run_suite
+
+
+def test_synthesized_song_is_deterministic():
+    song = synthesize_song(duration=2, sample_rate=8000, channels=2)
+
+    assert song.shape == (16000, 2)
+    assert np.abs(song).max() <= 1
+    np.testing.assert_array_equal(song, synthesize_song(duration=2, sample_rate=8000, channels=2))
+
+
+def test_suite_results_are_json():
+    results = run_suite(BpmBackend(120, 0), duration=4, sample_rate=8000, repeat=1, only="effect/")
+
+    assert results["config"]["backend"] == "beatmachine.backends.bpm.BpmBackend"
+    assert {"effect/reverse", "effect/swap"} <= set(results["results"])
+    assert all(result["min"] > 0 and len(result["seconds"]) == 1 for result in results["results"].values())
+    json.dumps(results)
+
+
+def test_suite_times_startup():
+    results = run_suite(BpmBackend(120, 0), duration=1, sample_rate=8000, repeat=1, only="startup/")
+
+    assert set(results["results"]) == {"startup/import", "startup/version"}
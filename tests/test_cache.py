@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.cache import BeatCache, backend_params, fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BeatCache(tmp_path / "cache")
+
+
+def test_put_and_get(cache):
+    cache.put("abc", np.array([1, 2, 3]), {"sample_rate": 44100})
+
+    beat_locations, metadata = cache.get("abc")
+
+    np.testing.assert_array_equal([1, 2, 3], beat_locations)
+    assert metadata == {"sample_rate": 44100}
+    assert cache.get("def") is None
+
+
+def test_key_depends_on_params(cache, drums_wav_path):
+    key = cache.key(drums_wav_path, backend_params(BpmBackend(120, 0)))
+
+    assert key == cache.key(drums_wav_path, backend_params(BpmBackend(120, 0)))
+    assert key != cache.key(drums_wav_path, backend_params(BpmBackend(121, 0)))
+
+
+@pytest.mark.parametrize("contents", [b"", b"abc" * 100000])
+def test_fingerprint_hashes_contents(tmp_path, contents):
+    path = tmp_path / "song.wav"
+    path.write_bytes(contents)
+
+    assert fingerprint(path) == hashlib.sha256(contents).hexdigest()
+
+
+def test_cached_fingerprint_is_reused_until_file_changes(cache, tmp_path):
+    path = tmp_path / "song.wav"
+    path.write_bytes(b"abc")
+    digest = cache.fingerprint(path)
+    assert digest == fingerprint(path)
+
+    # Unchanged files aren't read again, so a tampered record shows through unless the stat fast path is disabled.
+    (recorded,) = cache.directory.glob("*.fingerprint")
+    recorded.write_text("tampered")
+    assert cache.fingerprint(path) == "tampered"
+    assert cache.fingerprint(path, trust_stat=False) == digest
+    assert cache.fingerprint(path) == digest
+
+    path.write_bytes(b"abcd")
+    assert cache.fingerprint(path) == hashlib.sha256(b"abcd").hexdigest()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = BeatCache(tmp_path, max_bytes=10**9)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, np.arange(100))
+        os.utime(cache.directory / (key + ".npz"), (i, i))
+
+    assert cache.get("a") is not None
+    cache.max_bytes = 2 * (cache.directory / "a.npz").stat().st_size
+    cache.evict()
+
+    assert [cache.get(k) is not None for k in "abc"] == [True, False, True]
+    assert not list(tmp_path.glob(".tmp-*"))
+
+
+def test_legacy_entries_are_evicted(cache):
+    legacy = cache.directory / hashlib.md5(b"song.mp3").hexdigest()
+    legacy.write_bytes(b"pickled song")
+    unrelated = cache.directory / "notes.txt"
+    unrelated.write_bytes(b"keep")
+
+    cache.put("abc", np.arange(10))
+
+    assert not legacy.exists() and unrelated.exists()
+    assert cache.get("abc") is not None
+
+
+def test_from_song_uses_cache(cache, drums_wav_path, counting_backend):
+    backend = counting_backend(120, 0)
+    other_backend = counting_backend(90, 0)
+
+    first = Beats.from_song(drums_wav_path, backend, cache=cache)
+    second = Beats.from_song(drums_wav_path, backend, cache=cache)
+    Beats.from_song(drums_wav_path, other_backend, cache=cache)
+
+    assert (backend.calls, other_backend.calls) == (1, 1)
+    np.testing.assert_array_equal(first.to_ndarray(), second.to_ndarray())
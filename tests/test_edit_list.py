@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.edit_list import EditList, Segment, collect
+
+
+@pytest.fixture
+def stereo_signal():
+    return np.stack([np.arange(20.0), -np.arange(20.0)], axis=1)
+
+
+@pytest.mark.parametrize("boundaries", [[4, 8, 12, 16], [0, 5, 5, 19], [3, 40]])
+def test_from_boundaries_matches_split(stereo_signal, boundaries):
+    edits = EditList.from_boundaries(stereo_signal, np.array(boundaries))
+    expected = np.split(stereo_signal, boundaries)
+
+    assert len(edits) == len(expected)
+    for e, a in zip(expected, edits):
+        np.testing.assert_array_equal(e, np.asarray(a))
+
+
+@pytest.mark.parametrize(
+    "key",
+    [slice(2, 5), slice(None, None, -1), (slice(1, 3), Ellipsis), slice(10, 20), slice(-2, None)],
+)
+def test_segment_slicing_matches_ndarray(stereo_signal, key):
+    segment = Segment(stereo_signal, 4, 12)[::-1]
+    sliced = segment[key]
+
+    assert isinstance(sliced, Segment)
+    np.testing.assert_array_equal(np.asarray(segment)[key], np.asarray(sliced))
+
+
+def test_segment_falls_back_to_ndarray(stereo_signal):
+    segment = Segment(stereo_signal, 4, 8)
+
+    np.testing.assert_array_equal(stereo_signal[4:8:2], segment[::2])
+    np.testing.assert_array_equal(stereo_signal[4:8] * 2, segment * 2)
+
+
+def test_collect_keeps_segments_compact(stereo_signal):
+    edits = EditList.from_boundaries(stereo_signal, [4, 8])
+
+    assert isinstance(collect(fx.ReverseEveryNth(period=2)(edits)), EditList)
+    assert isinstance(collect(fx.SilenceEveryNth(period=2)(iter(edits))), EditList)
+    assert isinstance(collect(fx.RepeatEveryNth(period=2)(iter(edits))), EditList)
+    assert isinstance(collect(fx.CutEveryNth()(fx.RepeatEveryNth()(iter(edits)))), list)
+
+
+def test_silent_and_repeated_segments(stereo_signal):
+    segment = Segment(stereo_signal, 4, 8, -1, repeats=3)
+    expected = np.concatenate(3 * [stereo_signal[4:8][::-1]])
+
+    assert len(segment) == 12
+    np.testing.assert_array_equal(expected, segment)
+    np.testing.assert_array_equal(expected[::-1], segment[::-1])
+    np.testing.assert_array_equal(expected[2:7], segment[2:7])
+    np.testing.assert_array_equal(expected, np.concatenate(list(segment.blocks())))
+
+    silence = Segment.silence(stereo_signal, 6)
+    np.testing.assert_array_equal(np.zeros((6, 2)), silence)
+    assert silence[1:4].step == 0 and len(silence[1:4]) == 3
+
+
+def test_edit_list_renders_descriptors(stereo_signal):
+    edits = EditList(stereo_signal, [0, 0, 8], [4, 5, 10], [1, 0, -1], [2, 1, 3])
+    expected = np.concatenate([stereo_signal[0:4], stereo_signal[0:4], np.zeros((5, 2))] + 3 * [stereo_signal[9:7:-1]])
+
+    np.testing.assert_array_equal(expected, edits.render())
+    np.testing.assert_array_equal(expected, np.concatenate(list(edits)))
+    assert edits.lengths.tolist() == [8, 5, 6]
+
+
+def test_apply_all_matches_split_beats(stereo_signal):
+    boundaries = [3, 6, 8, 12, 15, 17]
+    effects = [
+        fx.SwapBeats(x_period=2, y_period=4),
+        fx.RemoveEveryNth(period=3),
+        fx.ReverseEveryNth(period=2),
+        fx.CutEveryNth(period=3, denominator=2, take_index=1),
+        fx.SilenceEveryNth(period=4),
+        fx.RepeatEveryNth(period=2, times=3),
+    ]
+
+    split = Beats(1, 2, np.split(stereo_signal, boundaries)).apply_all(*effects)
+    edits = Beats(1, 2, EditList.from_boundaries(stereo_signal, boundaries)).apply_all(*effects)
+
+    np.testing.assert_array_equal(split.to_ndarray(), edits.to_ndarray())
@@ -1,7 +1,8 @@
 import pytest
+from jsonschema.exceptions import ValidationError
 
 import beatmachine.effects as fx
-from beatmachine.effect_registry import EffectRegistry
+from beatmachine.effect_registry import EffectABCMeta, EffectRegistry, LoadableEffect
 
 
 @pytest.mark.parametrize(
@@ -32,3 +33,50 @@ from beatmachine.effect_registry import EffectRegistry
 )
 def test_load_effect(definition, expected):
     assert EffectRegistry.load_effect(definition) == expected
+
+
+def test_load_effect_chain():
+    chain = EffectRegistry.load_effect_chain([{"type": "silence", "period": 2}, {"type": "reverseb"}])
+
+    assert chain == [fx.SilenceEveryNth(period=2), fx.ReverseAllBeats()]
+
+
+@pytest.mark.parametrize(
+    "chain,path",
+    [
+        ([{"type": "reverse"}, {"type": "nonexistent"}], [1, "type"]),
+        ([{"type": "reverse"}, {"type": "swap", "x_period": 0}], [1, "x_period"]),
+        ([{"type": "silence", "unknown": 1}], [0]),
+        ([{"period": 2}], [0]),
+    ],
+)
+def test_load_effect_chain_reports_specific_errors(chain, path):
+    with pytest.raises(ValidationError) as e:
+        EffectRegistry.load_effect_chain(chain)
+
+    assert list(e.value.absolute_path) == path
+
+
+def test_validators_are_cached_until_an_effect_is_registered():
+    validator = EffectRegistry.get_chain_validator()
+    assert EffectRegistry.get_chain_validator() is validator
+    assert EffectRegistry.get_validator("swap") is EffectRegistry.get_validator("swap")
+
+    class TestOnlyEffect(LoadableEffect, metaclass=EffectABCMeta):
+        """
+        Does nothing.
+        """
+
+        __effect_name__ = "testonly"
+        __effect_schema__ = {}
+
+        def __call__(self, beats):
+            return beats
+
+    try:
+        assert EffectRegistry.get_chain_validator() is not validator
+        assert EffectRegistry.load_effect_chain([{"type": "testonly"}])
+    finally:
+        del EffectRegistry.effects["testonly"], EffectRegistry.schemas["testonly"]
+        EffectRegistry.validators = {}
+        EffectRegistry.chain_validator = None
@@ -1,6 +1,12 @@
 # These tests are kind of naive, but are better than nothing for now.
 
+import numpy as np
+import pytest
+
 from beatmachine import Beats
+from beatmachine.loader import load_many
+from beatmachine.loaders.ffmpeg import FfmpegLoader
+from beatmachine.loaders.soundfile import SoundfileLoader
 
 
 def test_can_load_mp3(drums_mp3_path):
@@ -11,3 +17,35 @@ def test_can_load_mp3(drums_mp3_path):
 def test_can_load_wav(drums_wav_path):
     data = Beats.from_song(drums_wav_path).to_ndarray()
     assert (data != 0).any()
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int16])
+def test_ffmpeg_loader_matches_soundfile(drums_wav_path, dtype):
+    expected, expected_sample_rate = SoundfileLoader().load(drums_wav_path, dtype)
+    actual, sample_rate = FfmpegLoader().load(drums_wav_path, dtype)
+
+    assert sample_rate == expected_sample_rate
+    assert actual.dtype == dtype
+    np.testing.assert_array_equal(expected, actual)
+
+
+def test_soundfile_loader_falls_back(tmp_path):
+    class FallbackLoader:
+        def load(self, path, dtype):
+            return np.zeros((1, 1), dtype=dtype), 1
+
+    not_audio = tmp_path / "not_audio.wav"
+    not_audio.write_text("not audio")
+
+    signal, sample_rate = SoundfileLoader(fallback=FallbackLoader()).load(not_audio, np.float32)
+    assert signal.shape == (1, 1) and sample_rate == 1
+
+
+def test_load_many(drums_mp3_path, drums_wav_path):
+    loader = SoundfileLoader(fallback=FfmpegLoader())
+    paths = [drums_wav_path, drums_mp3_path, drums_wav_path]
+
+    decoded = load_many(loader, paths, np.float32, max_workers=2)
+
+    assert len(decoded) == 3
+    np.testing.assert_array_equal(decoded[0][0], decoded[2][0])
@@ -0,0 +1,55 @@
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.edit_list import EditList
+from beatmachine.effect_registry import EffectRegistry
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    return rng.uniform(-1, 1, size=(400, 2))
+
+
+@pytest.fixture
+def boundaries():
+    return np.arange(7, 400, 13)
+
+
+@pytest.mark.parametrize("example", sorted(EXAMPLES_DIR.glob("*.json")), ids=lambda p: p.stem)
+def test_compiled_examples_are_byte_identical(signal, boundaries, example):
+    with example.open() as fp:
+        effects = EffectRegistry.load_effect_chain(json.load(fp))
+
+    random.seed(0)
+    expected = Beats(1, 2, np.split(signal, boundaries)).apply_all(*effects).to_ndarray()
+
+    random.seed(0)
+    plan = Beats(1, 2, EditList.from_boundaries(signal, boundaries)).compile(*effects)
+
+    assert expected.tobytes() == plan.render().tobytes()
+
+
+def test_compiled_plan_with_literals_is_byte_identical(signal, boundaries):
+    effects = [fx.SilenceEveryNth(period=3), fx.RepeatEveryNth(period=4, times=2), fx.ReverseEveryNth(period=2)]
+
+    expected = Beats(1, 2, np.split(signal, boundaries)).apply_all(*effects).to_ndarray()
+    plan = Beats(1, 2, EditList.from_boundaries(signal, boundaries)).compile(*effects)
+
+    assert expected.tobytes() == plan.render().tobytes()
+
+
+def test_contiguous_beats_are_fused(signal, boundaries):
+    beats = Beats(1, 2, EditList.from_boundaries(signal, boundaries))
+
+    assert len(beats.compile()) == 1
+    assert len(beats.compile(fx.ReverseAllBeats(), fx.ReverseEveryNth())) == 1
+    assert len(beats.compile(fx.SwapBeats(x_period=1, y_period=2, group_size=4))) < len(boundaries)
@@ -0,0 +1,63 @@
+import io
+
+import numpy as np
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.profiling import Profile, add_hook, remove_hook, stage
+
+
+def test_pipeline_stages_are_reported(tmp_path, drums_wav_path):
+    output = tmp_path / "out.wav"
+
+    with Profile() as profile:
+        beats = Beats.from_song(drums_wav_path, BpmBackend(120, 0))
+        beats = beats.apply_all(fx.RemoveEveryNth(period=2), fx.ReverseAllBeats())
+        beats.save(str(output))
+
+    load, detect, remove, reverse, save = profile.stages
+    assert [s.name for s in profile.stages] == ["load", "detect", "effect", "effect", "save"]
+    assert (remove.detail, reverse.detail) == ("remove", "reverseb")
+
+    assert load.bytes_in == drums_wav_path.stat().st_size and load.bytes_out > 0
+    assert detect.beats_out == remove.beats_in == 2 * remove.beats_out - remove.beats_in % 2
+    assert reverse.beats_out == save.beats_in
+    assert save.bytes_out == output.stat().st_size
+    assert all(s.wall_time > 0 and s.peak_bytes is not None for s in profile.stages)
+    assert profile.to_json()["totals"]["effect"]["count"] == 2
+
+
+def test_profiled_effects_match_unprofiled(drums_wav_path):
+    beats = Beats.from_song(drums_wav_path, BpmBackend(120, 0))
+    effects = [fx.SwapBeats(x_period=2, y_period=4), fx.RepeatEveryNth(period=3), fx.CutEveryNth(denominator=2)]
+
+    with Profile(trace_memory=False) as profile:
+        profiled = beats.apply_all(*effects).to_ndarray()
+
+    np.testing.assert_array_equal(profiled, beats.apply_all(*effects).to_ndarray())
+    assert len(profile.stages) == 3 and profile.stages[0].peak_bytes is None
+
+
+def test_saving_to_a_stream_reports_encoded_bytes(drums_wav_path):
+    beats = Beats.from_song(drums_wav_path, BpmBackend(120, 0))
+    buffer = io.BytesIO()
+
+    with Profile(trace_memory=False) as profile:
+        written = beats.save(buffer, out_format="wav")
+
+    (save,) = profile.stages
+    assert save.bytes_out == written == len(buffer.getvalue())
+    assert save.bytes_in == beats.to_ndarray().nbytes
+
+
+def test_hooks_are_only_called_while_registered():
+    stages = []
+    add_hook(stages.append)
+    with stage("effect", "first"):
+        pass
+    remove_hook(stages.append)
+    with stage("effect", "second"):
+        pass
+
+    assert [s.detail for s in stages] == ["first"]
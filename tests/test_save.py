@@ -0,0 +1,162 @@
+import asyncio
+import io
+import subprocess
+
+import numpy as np
+import pytest
+import soundfile
+
+import beatmachine.effects as fx
+from beatmachine import Beats
+from beatmachine.edit_list import EditList
+
+
+def test_save_streams_same_samples_as_to_ndarray(beats):
+    beats = beats.apply_all(fx.SilenceEveryNth(period=2), fx.ReverseEveryNth(period=3))
+
+    stream = io.BytesIO()
+    stream.close = lambda: None
+    beats._write_samples(stream)
+
+    assert stream.getvalue() == beats.to_ndarray().astype(np.float64).tobytes()
+
+
+def test_save_to_binary_io(beats):
+    fp = io.BytesIO()
+    beats.save(fp, out_format="wav")
+
+    data, sample_rate = soundfile.read(io.BytesIO(fp.getvalue()))
+    assert sample_rate == 8000
+    np.testing.assert_allclose(beats.to_ndarray(), data, atol=1e-3)
+
+
+def test_save_to_binary_io_forwards_chunks(beats):
+    class ChunkRecorder(io.RawIOBase):
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, b):
+            self.chunks.append(bytes(b))
+            return len(b)
+
+    recorder = ChunkRecorder()
+    written = beats.apply(fx.RepeatEveryNth(times=64)).save(recorder, out_format="wav")
+
+    assert len(recorder.chunks) > 1
+    assert written == sum(len(c) for c in recorder.chunks)
+
+
+@pytest.mark.parametrize("dtype,scale", [(np.float32, 1), (np.int16, np.iinfo(np.int16).max)])
+def test_save_with_dtype(beats, dtype, scale):
+    signal = (beats.to_ndarray() * scale).astype(dtype)
+    beats = Beats(8000, 2, EditList.from_boundaries(signal, [4000]))
+    assert beats.dtype == dtype
+
+    fp = io.BytesIO()
+    beats.apply(fx.SilenceEveryNth(period=2)).save(fp, out_format="wav")
+
+    data, _ = soundfile.read(io.BytesIO(fp.getvalue()))
+    np.testing.assert_allclose(signal[:4000] / scale, data[:4000], atol=1e-3)
+    assert not data[4000:].any()
+
+
+def test_unsupported_dtype_disallowed():
+    with pytest.raises(ValueError):
+        _ = Beats(8000, 1, [np.zeros(4)], dtype=np.int32)
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_save_all_matches_individual_saves(beats, compiled):
+    chains = [[fx.ReverseEveryNth(period=2)], [fx.SilenceEveryNth(period=3)], [], [fx.RepeatEveryNth(times=2)]]
+    outputs = [io.BytesIO() for _ in chains]
+
+    beats.save_all(zip(chains, outputs), out_format="wav", max_workers=2, compiled=compiled)
+
+    for effects, fp in zip(chains, outputs):
+        expected = io.BytesIO()
+        beats.apply_all(*effects).save(expected, out_format="wav")
+        assert fp.getvalue() == expected.getvalue()
+
+
+def test_save_all_rejects_lazy_beats(beats):
+    lazy = Beats(8000, 2, iter(beats._beats))
+
+    with pytest.raises(ValueError):
+        lazy.save_all([([], io.BytesIO())], out_format="wav")
+
+
+@pytest.mark.parametrize("start,end", [(0, 0.3), (0.1, 0.77), (0.5, None), (0.95, 2), (2, 3)])
+def test_trim_matches_slicing_rendered_output(beats, start, end):
+    beats = beats.apply_all(
+        fx.RepeatEveryNth(period=2, times=3), fx.ReverseEveryNth(period=3), fx.SilenceEveryNth(period=4)
+    )
+    rendered = beats.to_ndarray()
+
+    trimmed = beats.trim(start, end)
+
+    expected = rendered[int(start * 8000) : None if end is None else int(end * 8000)]
+    actual = np.concatenate([np.asarray(beat) for beat in trimmed._beats] or [np.empty((0, 2))])
+    np.testing.assert_array_equal(expected, actual)
+
+
+def test_trim_stops_consuming_lazy_beats(beats):
+    consumed = []
+
+    def lazy():
+        for beat in beats._beats:
+            consumed.append(beat)
+            yield beat
+
+    trimmed = Beats(8000, 2, lazy()).apply(fx.ReverseEveryNth(period=2)).trim(0, 0.2)
+    assert len(np.concatenate(list(trimmed._beats))) == 1600
+    assert len(consumed) == 4
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_save_time_range(beats, compiled):
+    effects = [fx.RepeatEveryNth(period=2), fx.SwapBeats()]
+    fp, all_fp = io.BytesIO(), io.BytesIO()
+
+    beats.save(fp, out_format="wav", time_range=(0, 0.5))
+    beats.save_all([(effects, all_fp)], out_format="wav", compiled=compiled, time_range=(0.25, 0.5))
+
+    data, _ = soundfile.read(io.BytesIO(fp.getvalue()))
+    np.testing.assert_allclose(beats.to_ndarray()[:4000], data, atol=1e-3)
+
+    data, _ = soundfile.read(io.BytesIO(all_fp.getvalue()))
+    np.testing.assert_allclose(beats.apply_all(*effects).to_ndarray()[2000:4000], data, atol=1e-3)
+
+
+@pytest.mark.parametrize("frames", [8000, 8000 * 60])
+def test_failed_encode_raises(tmp_path, frames):
+    # A minute of audio is several MB, far more than fits in the pipe to ffmpeg, so writes fail once it exits.
+    signal = np.zeros((frames, 2))
+    beats = Beats(8000, 2, EditList.from_boundaries(signal, np.arange(4000, frames, 4000)))
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        beats.save(str(tmp_path / "missing" / "out.wav"))
+    assert e.value.stderr
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        beats.save(io.BytesIO(), out_format="not-a-format")
+    assert e.value.stderr
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        asyncio.run(beats.save_async(io.BytesIO(), out_format="not-a-format"))
+    assert e.value.stderr
+
+
+def test_save_to_writers_that_return_none(beats):
+    class Response:
+        def __init__(self):
+            self.content = b""
+
+        def write(self, data):
+            self.content += data
+
+    response = Response()
+    written = beats.save(response, out_format="wav")
+
+    assert written == len(response.content)
+    data, _ = soundfile.read(io.BytesIO(response.content))
+    np.testing.assert_allclose(beats.to_ndarray(), data, atol=1e-3)
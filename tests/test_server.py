@@ -0,0 +1,115 @@
+import http.client
+import json
+import threading
+import urllib.parse
+
+import pytest
+
+from beatmachine.backends.bpm import BpmBackend
+from beatmachine.beats import Beats
+from beatmachine.server import JobServer, get_job, submit_job
+
+
+@pytest.fixture
+def server_url():
+    job_server = JobServer(BpmBackend(120, 0))
+    started = threading.Event()
+    http_servers = []
+
+    def ready(http_server):
+        http_servers.append(http_server)
+        started.set()
+
+    thread = threading.Thread(target=job_server.serve, args=("127.0.0.1", 0, ready), daemon=True)
+    thread.start()
+    started.wait()
+
+    host, port = http_servers[0].server_address
+    yield f"http://{host}:{port}"
+
+    http_servers[0].shutdown()
+    thread.join()
+    job_server.close()
+
+
+def test_preprocess_then_apply(server_url, tmp_path, drums_wav_path):
+    job_id = submit_job(
+        {"command": "preprocess", "input": str(drums_wav_path), "output": str(tmp_path / "d.beat")}, server_url
+    )
+    job = get_job(job_id, server_url, wait=30)
+    assert job["status"] == "done"
+    assert set(job["timings"]) == {"load", "write"}
+
+    request = {
+        "command": "apply",
+        "input": str(tmp_path / "d.beat"),
+        "effects": [{"type": "reverse"}],
+        "output": str(tmp_path / "out.wav"),
+    }
+    job = get_job(submit_job(request, server_url), server_url, wait=30)
+    assert job["status"] == "done"
+    assert len(Beats.from_beat_file(tmp_path / "d.beat").to_ndarray()) > 0
+    assert (tmp_path / "out.wav").is_file()
+
+
+def test_failed_jobs_are_reported(server_url, tmp_path):
+    request = {"command": "apply", "input": str(tmp_path / "missing.wav"), "effects": [], "output": "out.wav"}
+    job = get_job(submit_job(request, server_url), server_url, wait=30)
+
+    assert job["status"] == "failed"
+    assert job["error"]
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"command": "delete"},
+        {"command": "apply", "input": "a.wav"},
+        {"command": "preprocess", "input": ["a.wav"], "output": "a.beat"},
+    ],
+)
+def test_invalid_jobs_are_rejected(server_url, request_):
+    with pytest.raises(RuntimeError):
+        submit_job(request_, server_url)
+
+
+def test_unknown_jobs_are_not_found(server_url):
+    with pytest.raises(RuntimeError, match="no such job"):
+        get_job("nonexistent", server_url)
+
+
+def test_requests_cant_overwrite_job_status(server_url, tmp_path):
+    request = {"command": "apply", "input": str(tmp_path / "missing.wav"), "effects": [], "output": "out.wav"}
+    job = get_job(submit_job({**request, "status": "done", "error": None}, server_url), server_url, wait=30)
+
+    assert job["status"] == "failed"
+    assert job["request"]["status"] == "done"
+
+
+def _post(url: str, body: bytes, headers: dict) -> int:
+    address = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port, timeout=30)
+    try:
+        connection.request("POST", "/jobs", body, headers)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({"Content-Type": "text/plain"}, 415),
+        ({"Content-Type": "application/json", "Origin": "https://example.com"}, 403),
+        ({"Content-Type": "application/json", "Host": "attacker.example.com"}, 403),
+    ],
+)
+def test_cross_origin_requests_are_rejected(server_url, tmp_path, headers, status):
+    request = {"command": "apply", "input": str(tmp_path / "missing.wav"), "effects": [], "output": "out.wav"}
+    assert _post(server_url, json.dumps(request).encode(), headers) == status
+
+
+def test_same_origin_requests_are_accepted(server_url, tmp_path):
+    request = {"command": "apply", "input": str(tmp_path / "missing.wav"), "effects": [], "output": "out.wav"}
+    headers = {"Content-Type": "application/json; charset=utf-8", "Origin": server_url}
+    assert _post(server_url, json.dumps(request).encode(), headers) == 202
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are slow to import, and shouldn't be loaded by commands that don't need them.
+HEAVY_MODULES = ["madmom", "scipy", "soundfile", "jsonschema", "beatmachine.beats"]
+
+SCRIPT = """
+import json, sys
+from click.testing import CliRunner
+from beatmachine.__main__ import cli
+
+result = CliRunner().invoke(cli, sys.argv[1:])
+assert result.exit_code == 0, result.output
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+@pytest.mark.parametrize("args", [["version"], ["effects"], ["effects", "swap"], ["effects", "-j"]])
+def test_metadata_commands_dont_import_heavy_modules(args):
+    result = subprocess.run([sys.executable, "-c", SCRIPT, *args], capture_output=True, text=True, check=True)
+
+    imported = json.loads(result.stdout.splitlines()[-1])
+    assert [m for m in HEAVY_MODULES if m in imported] == []
+
+
+def test_lazy_submodules_resolve_as_attributes():
+    script = "import beatmachine as bm; bm.backends.madmom.MadmomDbnBackend; bm.loaders.soundfile.SoundfileLoader"
+    subprocess.run([sys.executable, "-c", script], check=True)